@@ -0,0 +1,239 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+
+import testing
+from ocr_backends import BACKENDS, create_backend
+
+# ========================
+# Synthetic corpus
+# ========================
+KINDS = ["text", "image", "scan"]
+NAMES = ["Asha Verma", "Daniel Okafor", "Mei Lin", "Carlos Rivera", "Priya Nair", "Jonas Berg"]
+IMAGE_DPIS = [100, 150, 200, 300]
+
+def _issuer_display(key: str) -> str:
+    return key.replace("-", " ").title()
+
+def _safe_skills():
+    # Skills containing an issuer name ("AWS", "Google Cloud") would make the issuer
+    # ground truth ambiguous, so leave them out of the generated text.
+    issuer_tokens = {tok for key in testing.ISSUER_DB for tok in testing._tokens(key)}
+    return [s for s in testing.get_skill_tags() if not set(testing._tokens(s)) & issuer_tokens]
+
+def certificate_text(rng: random.Random, issuer: str, skills: list) -> str:
+    hours = rng.choice([6, 12, 20, 40, 80])
+    code = "".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ23456789") for _ in range(8))
+    return "\n".join([
+        "CERTIFICATE OF COMPLETION",
+        "This certifies that",
+        rng.choice(NAMES),
+        "has successfully completed a course covering",
+        ", ".join(skills),
+        f"Issued by {_issuer_display(issuer)}",
+        f"Duration: {hours} hours",
+        f"Verify at https://verify.example.org/{code}",
+    ])
+
+def _text_page(doc, text: str):
+    page = doc.new_page(width=842, height=595)  # A4 landscape
+    page.insert_textbox(page.rect + (60, 60, -60, -60), text, fontsize=20, align=1)
+    return page
+
+def _rasterize(text: str, dpi: int, noise: float, rng: random.Random):
+    import fitz  # PyMuPDF
+    from PIL import Image
+    doc = fitz.open()
+    pix = _text_page(doc, text).get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    img = Image.frombytes("L", [pix.width, pix.height], pix.samples)
+    if noise:
+        grain = Image.effect_noise(img.size, 64).point(lambda v: 255 if v > 128 else 0)
+        img = Image.blend(img, grain, noise)
+    if rng.random() < 0.5:
+        img = img.rotate(rng.uniform(-1.5, 1.5), fillcolor=255, expand=False)
+    return img
+
+def generate_corpus(directory: str, count: int, kinds=KINDS, seed: int = 0):
+    """Writes ``count`` synthetic certificates to ``directory`` and returns a list of
+    ground-truth dicts: {"file", "kind", "issuer", "skills", "dpi"}."""
+    import fitz  # PyMuPDF
+    rng = random.Random(seed)
+    issuers = sorted(testing.ISSUER_DB)
+    skills = _safe_skills()
+    corpus = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        issuer = rng.choice(issuers)
+        picked = rng.sample(skills, rng.randint(1, 4))
+        text = certificate_text(rng, issuer, picked)
+        dpi = None
+        if kind == "text":
+            path = os.path.join(directory, f"cert_{i:05d}_text.pdf")
+            doc = fitz.open()
+            _text_page(doc, text)
+            doc.save(path)
+        elif kind == "image":
+            dpi = rng.choice(IMAGE_DPIS)
+            path = os.path.join(directory, f"cert_{i:05d}_image.png")
+            _rasterize(text, dpi, rng.choice([0, 0.1, 0.2]), rng).save(path)
+        else:
+            dpi = rng.choice(IMAGE_DPIS[1:])
+            path = os.path.join(directory, f"cert_{i:05d}_scan.pdf")
+            doc = fitz.open()
+            pages = [text] + [f"Transcript page {n + 2}\nModule {n + 1} assessment record" for n in range(rng.randint(1, 3))]
+            for page_text in pages:
+                buf = io.BytesIO()
+                _rasterize(page_text, dpi, 0.1, rng).save(buf, format="PNG")
+                page = doc.new_page(width=842, height=595)
+                page.insert_image(page.rect, stream=buf.getvalue())
+            doc.save(path)
+        corpus.append({"file": path, "kind": kind, "issuer": issuer, "skills": picked, "dpi": dpi})
+    return corpus
+
+# ========================
+# Benchmark
+# ========================
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def run_benchmark(corpus: list, workers: int = 1) -> dict:
+    truth = {c["file"]: c for c in corpus}
+    stages, per_kind = {}, {}
+    issuer_hits = skill_tp = skill_fp = skill_fn = 0
+    start = time.perf_counter()
+    files = [c["file"] for c in corpus]
+    if workers > 1:
+        results = testing.iter_analyze_batch(files, workers, timings=True)
+    else:
+        results = ((f, testing.analyze_certificate(f, timings=True)) for f in files)
+    for file_path, res in results:
+        gt = truth[file_path]
+        for name, ms in res.get("timings", {}).get("stages_ms", {}).items():
+            stages.setdefault(name, []).append(ms)
+        per_kind.setdefault(gt["kind"], []).append(res.get("timings", {}).get("stages_ms", {}).get("total", 0.0))
+        issuer_hits += res.get("issuer") == gt["issuer"]
+        found, expected = set(res.get("skills", [])), set(gt["skills"])
+        skill_tp += len(found & expected)
+        skill_fp += len(found - expected)
+        skill_fn += len(expected - found)
+    elapsed = time.perf_counter() - start
+    summarize = lambda v: {"count": len(v), "p50_ms": round(_percentile(v, 0.50), 3),
+                           "p95_ms": round(_percentile(v, 0.95), 3)}
+    return {
+        "documents": len(corpus),
+        "workers": workers,
+        "elapsed_s": round(elapsed, 3),
+        "docs_per_sec": round(len(corpus) / elapsed, 3) if elapsed else 0.0,
+        "stages": {name: summarize(v) for name, v in stages.items()},
+        "latency_by_kind": {kind: summarize(v) for kind, v in per_kind.items()},
+        "accuracy": {
+            "issuer": round(issuer_hits / len(corpus), 4) if corpus else 0.0,
+            "skill_precision": round(skill_tp / (skill_tp + skill_fp), 4) if skill_tp + skill_fp else 0.0,
+            "skill_recall": round(skill_tp / (skill_tp + skill_fn), 4) if skill_tp + skill_fn else 0.0,
+        },
+    }
+
+def benchmark_backends(names: list, count: int = 10, seed: int = 0) -> dict:
+    # Times image_to_string per backend on the same preprocessed certificate images,
+    # isolating the OCR hand-off (temp files vs pipes vs in-process) from the rest.
+    rng = random.Random(seed)
+    skills = _safe_skills()
+    images = [testing.preprocess_pil_image(_rasterize(
+                  certificate_text(rng, rng.choice(sorted(testing.ISSUER_DB)), rng.sample(skills, 2)),
+                  rng.choice(IMAGE_DPIS), 0.1, rng))
+              for _ in range(count)]
+    report = {}
+    for name in names:
+        try:
+            backend = create_backend(name, testing.CONFIG.tesseract_cmd, testing.CONFIG.temp_dir)
+            backend.image_to_string(images[0])  # warm-up: first process start / API init
+        except (ImportError, OSError, RuntimeError) as e:
+            # missing module, missing binary, or an engine that fails to start
+            report[name] = {"error": str(e)}
+            continue
+        times, chars = [], 0
+        for img in images:
+            start = time.perf_counter()
+            chars += len(backend.image_to_string(img))
+            times.append((time.perf_counter() - start) * 1000)
+        backend.close()
+        report[name] = {"images": len(images), "mean_ms": round(sum(times) / len(times), 3),
+                        "p50_ms": round(_percentile(times, 0.50), 3),
+                        "p95_ms": round(_percentile(times, 0.95), 3), "chars": chars}
+    return report
+
+def print_backend_report(report: dict):
+    print(f"{'backend':<14}{'images':>8}{'mean ms':>12}{'p50 ms':>12}{'p95 ms':>12}")
+    for name, r in report.items():
+        if "error" in r:
+            print(f"{name:<14}  unavailable: {r['error']}")
+        else:
+            print(f"{name:<14}{r['images']:>8}{r['mean_ms']:>12}{r['p50_ms']:>12}{r['p95_ms']:>12}")
+
+def print_report(report: dict):
+    print(f"[+] {report['documents']} documents, {report['workers']} worker(s): "
+          f"{report['elapsed_s']}s, {report['docs_per_sec']} docs/sec")
+    print(f"{'stage':<16}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}")
+    for name, s in sorted(report["stages"].items()):
+        print(f"{name:<16}{s['count']:>8}{s['p50_ms']:>12}{s['p95_ms']:>12}")
+    for kind, s in sorted(report["latency_by_kind"].items()):
+        print(f"[+] {kind:<6} total p50 {s['p50_ms']} ms, p95 {s['p95_ms']} ms")
+    acc = report["accuracy"]
+    print(f"[+] issuer accuracy {acc['issuer']}, skill precision {acc['skill_precision']}, "
+          f"recall {acc['skill_recall']}")
+
+# ========================
+# CLI
+# ========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput/accuracy benchmark on a synthetic certificate corpus")
+    parser.add_argument("--count", type=int, default=60, help="Number of synthetic certificates")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="Comma-separated subset of: " + ", ".join(KINDS))
+    parser.add_argument("--workers", type=int, default=1, help="Batch worker processes (1 = in-process)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", help="Keep the generated corpus here instead of a temp dir")
+    parser.add_argument("--save-json", help="Save the report JSON to file")
+    parser.add_argument("--compare-backends", nargs="?", const=",".join(BACKENDS), default=None,
+                        help="Instead of the pipeline benchmark, time OCR backends head to head "
+                             "(comma-separated, default: all)")
+    args = parser.parse_args()
+
+    kinds = [k for k in args.kinds.split(",") if k]
+    if set(kinds) - set(KINDS):
+        parser.error(f"unknown kinds: {', '.join(sorted(set(kinds) - set(KINDS)))}")
+    if set(kinds) - {"text"} and not shutil.which(testing.CONFIG.tesseract_cmd or "tesseract"):
+        print("[!] tesseract not found; OCR kinds will report empty text", file=sys.stderr)
+    if args.compare_backends:
+        report = benchmark_backends([b for b in args.compare_backends.split(",") if b], args.count, args.seed)
+        print_backend_report(report)
+        if args.save_json:
+            with open(args.save_json, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=4)
+            print(f"[+] Saved report to {args.save_json}")
+        sys.exit(0)
+
+    # measure the pipeline, not the cache
+    testing.configure(cache_enabled=False)
+
+    directory = args.corpus_dir or tempfile.mkdtemp(prefix="cert-bench-")
+    os.makedirs(directory, exist_ok=True)
+    try:
+        corpus = generate_corpus(directory, args.count, kinds, args.seed)
+        report = run_benchmark(corpus, args.workers)
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(directory, ignore_errors=True)
+    print_report(report)
+    if args.save_json:
+        with open(args.save_json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"[+] Saved report to {args.save_json}")
@@ -0,0 +1,136 @@
+import os
+import sys
+import re
+import json
+import time
+import threading
+
+# ========================
+# Issuer registry
+# ========================
+# issuers.json holds one record per issuer: canonical name, reputation score,
+# aliases seen on certificates and the domains its verification links live on.
+# Everything is indexed into dicts on load so alias and domain lookups are O(1),
+# and the file is re-read when it changes on disk.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.environ.get("ISSUER_REGISTRY_PATH", os.path.join(BASE_DIR, "issuers.json"))
+DEFAULT_SCORE = 25
+# How often (seconds) lookups stat the file for changes.
+RELOAD_CHECK_INTERVAL = 2.0
+
+_SPACE_RE = re.compile(r"\s+")
+
+def normalize_alias(text: str) -> str:
+    return _SPACE_RE.sub(" ", text.strip().lower())
+
+def normalize_domain(host: str) -> str:
+    host = host.strip().lower().rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+class IssuerRegistry:
+    """Issuer records from a JSON file, indexed by canonical name, alias and domain.
+
+    ``scores`` maps canonical name -> reputation and is replaced (never mutated) on
+    reload, so a reference taken by a caller stays consistent; ``version`` bumps on
+    every reload so derived structures know when to rebuild."""
+
+    def __init__(self, path: str = DEFAULT_PATH, check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.version = 0
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._checked = 0.0
+        self._tables = ({}, {}, {}, {})
+        self.reload()
+
+    @property
+    def scores(self) -> dict:
+        return self._tables[0]
+
+    @property
+    def aliases(self) -> dict:
+        """Normalized alias (canonical names included) -> canonical name."""
+        return self._tables[1]
+
+    @property
+    def domains(self) -> dict:
+        return self._tables[2]
+
+    @property
+    def records(self) -> dict:
+        return self._tables[3]
+
+    def _file_stamp(self):
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _build(self, data: dict):
+        scores, aliases, domains, records = {}, {}, {}, {}
+        for rec in data["issuers"]:
+            name = rec["name"]
+            records[name] = rec
+            scores[name] = rec.get("score", DEFAULT_SCORE)
+            aliases[normalize_alias(name)] = name
+            for alias in rec.get("aliases", []):
+                aliases[normalize_alias(alias)] = name
+            for domain in rec.get("domains", []):
+                domains[normalize_domain(domain)] = name
+        return scores, aliases, domains, records
+
+    def reload(self):
+        with self._lock:
+            stamp = self._file_stamp()
+            with open(self.path, "r", encoding="utf-8") as f:
+                tables = self._build(json.load(f))
+            self._tables = tables
+            self._stamp = stamp
+            self._checked = time.monotonic()
+            self.version += 1
+
+    def reload_if_changed(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+        try:
+            if self._file_stamp() == self._stamp:
+                return False
+            self.reload()
+            return True
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # half-written or broken file: keep serving the last good tables
+            print(f"[!] Issuer registry reload failed ({self.path}): {e}", file=sys.stderr)
+            return False
+
+    def score(self, name: str, default: int = DEFAULT_SCORE) -> int:
+        return self.scores.get(name, default)
+
+    def by_alias(self, alias: str):
+        return self.aliases.get(normalize_alias(alias))
+
+    def by_domain(self, host: str):
+        # "verify.coursera.org" -> tries verify.coursera.org, then coursera.org
+        domains = self.domains
+        host = normalize_domain(host)
+        while host:
+            if host in domains:
+                return domains[host]
+            _, _, host = host.partition(".")
+        return None
+
+_REGISTRIES = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+def get_registry(path: str = DEFAULT_PATH) -> IssuerRegistry:
+    # One shared registry per file per process, checked for changes on access.
+    path = os.path.abspath(path)
+    registry = _REGISTRIES.get(path)
+    if registry is None:
+        with _REGISTRIES_LOCK:
+            registry = _REGISTRIES.get(path)
+            if registry is None:
+                registry = _REGISTRIES[path] = IssuerRegistry(path)
+    registry.reload_if_changed()
+    return registry
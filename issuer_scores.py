@@ -1,12 +1,8 @@
-ISSUER_DB = {
-    "udemy":20, "coursera":30, "edx":40, "aws":80, "google":75, "microsoft":75,
-    "linkedin":25, "kaggle":50, "pluralsight":35, "datacamp":30, "simplilearn":25,
-    "harvard":95, "stanford":95, "mit":95, "iit":95, "oxford":90, "cambridge":90,
-    "yale":90, "princeton":90, "columbia":90, "caltech":95, "cornell":90, "ucla":85,
-    "nyu":85, "geeksforgeeks":20, "codechef":20, "hackerrank":20, "leetcode":20,
-    "freecodecamp":15, "sololearn":15, "nptel":40, "greatlearning":25, "upgrad":25,
-    "coursera-google":75, "coursera-aws":80, "aws-developer":80, "google-ai":75,
-    "deepmind":85, "ibm":70, "oracle":65, "sap":60, "accenture":50, "tcs":50,
-    "infosys":50, "wipro":50, "capgemini":50, "nasa":95, "spacex":95, "tesla":90,
-    "facebook":75, "meta":75, "twitter":70, "apple":80, "geeksforgeeks-cs":20
-}
+from issuer_registry import get_registry
+
+# Issuer reputation scores, read from the shared registry (issuers.json) so this
+# module and testing.py can't drift apart. Looked up on access to pick up edits.
+def __getattr__(name):
+    if name == "ISSUER_DB":
+        return get_registry().scores
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,239 @@
+import io
+import os
+import re
+import csv
+import queue
+import shlex
+import functools
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# ========================
+# OCR backends
+# ========================
+# Every backend takes a PIL image plus a tesseract-style config string and returns
+# plain text, an image_to_data-shaped dict of word boxes, or an OCRResult with both.
+# Engines are imported when a backend is constructed, so only the one in use must
+# be installed.
+
+PSM_REGEX = re.compile(r"--psm\s+(\d+)")
+OEM_REGEX = re.compile(r"--oem\s+(\d+)")
+DATA_KEYS = ("text", "conf", "left", "top", "width", "height", "page_num", "block_num", "par_num", "line_num")
+
+@dataclass
+class OCRResult:
+    """Recognized text plus the words it was built from, as
+    ``(text, conf, (left, top, width, height))`` tuples with conf in 0-100."""
+    text: str
+    words: list = field(default_factory=list)
+
+    @property
+    def confidence(self) -> float:
+        # mean word confidence; 0 when nothing was read
+        return sum(w[1] for w in self.words) / len(self.words) if self.words else 0.0
+
+    @classmethod
+    def from_data(cls, data: dict) -> "OCRResult":
+        # words on the same line joined by spaces, lines by newlines, blocks by a blank line
+        words, lines, keys = [], [], []
+        for i, word in enumerate(data["text"]):
+            word = word.strip()
+            if not word or data["conf"][i] < 0:
+                continue
+            words.append((word, data["conf"][i], (data["left"][i], data["top"][i], data["width"][i], data["height"][i])))
+            key = (data["page_num"][i], data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            if keys and keys[-1] == key:
+                lines[-1].append(word)
+                continue
+            if keys and keys[-1][:2] != key[:2]:
+                lines.append([])
+            keys.append(key)
+            lines.append([word])
+        return cls("\n".join(" ".join(line) for line in lines), words)
+
+class OCRBackend:
+    name = "base"
+
+    def image_to_string(self, img, config: str = "") -> str:
+        raise NotImplementedError
+
+    def image_to_data(self, img, config: str = "") -> dict:
+        """Word-level results as parallel lists, like pytesseract's Output.DICT:
+        text, conf, left, top, width, height, page_num, block_num, par_num, line_num."""
+        raise NotImplementedError
+
+    def recognize(self, img, config: str = "") -> OCRResult:
+        # text and word confidences from a single recognition pass
+        return OCRResult.from_data(self.image_to_data(img, config))
+
+    def close(self):
+        pass
+
+class PytesseractBackend(OCRBackend):
+    """The tesseract CLI via pytesseract: one process (and one language-model load)
+    per call."""
+    name = "pytesseract"
+
+    def __init__(self, tesseract_cmd: str = None, temp_dir: str = None):
+        import pytesseract
+        self.pytesseract = pytesseract
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        if temp_dir:
+            # point only pytesseract's temp files at temp_dir; the process-wide
+            # tempfile.tempdir (server uploads, everything else) is left alone
+            os.makedirs(temp_dir, exist_ok=True)
+            pytesseract.pytesseract.NamedTemporaryFile = functools.partial(tempfile.NamedTemporaryFile, dir=temp_dir)
+
+    def image_to_string(self, img, config: str = "") -> str:
+        return self.pytesseract.image_to_string(img, config=config)
+
+    def image_to_data(self, img, config: str = "") -> dict:
+        data = self.pytesseract.image_to_data(img, config=config, output_type=self.pytesseract.Output.DICT)
+        data["conf"] = [float(c) for c in data["conf"]]
+        return data
+
+class PipeTesseractBackend(OCRBackend):
+    """The tesseract CLI fed through pipes: the image goes in on stdin as an
+    uncompressed PNM and results come back on stdout, with no temp files."""
+    name = "pipe"
+
+    def __init__(self, tesseract_cmd: str = None):
+        self.cmd = tesseract_cmd or "tesseract"
+
+    def _run(self, img, config: str, *extra) -> str:
+        buf = io.BytesIO()
+        img.save(buf, format="PPM")  # P5/P6 PNM: no compression to pay for
+        proc = subprocess.run([self.cmd, "stdin", "stdout", *shlex.split(config or ""), *extra],
+                              input=buf.getvalue(), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if proc.returncode != 0:
+            raise RuntimeError(f"tesseract failed ({proc.returncode}): {proc.stderr.decode('utf-8', 'replace').strip()}")
+        return proc.stdout.decode("utf-8", "replace")
+
+    def image_to_string(self, img, config: str = "") -> str:
+        return self._run(img, config)
+
+    def image_to_data(self, img, config: str = "") -> dict:
+        rows = csv.DictReader(io.StringIO(self._run(img, config, "tsv")), delimiter="\t", quoting=csv.QUOTE_NONE)
+        data = {k: [] for k in DATA_KEYS}
+        for row in rows:
+            if row.get("level") != "5":  # words only
+                continue
+            data["text"].append(row["text"] or "")
+            data["conf"].append(float(row["conf"]))
+            for k in DATA_KEYS[2:]:
+                data[k].append(int(row[k]))
+        return data
+
+class TesserocrPoolBackend(OCRBackend):
+    """Pool of tesserocr handles on the Tesseract C API. Each handle loads its
+    language data once and is reused for every image, and a call checks one out,
+    so up to ``size`` threads recognize images concurrently.
+    Only ``--psm`` is honoured from the config string; the engine mode (``--oem``)
+    is fixed when a handle is created, so it is taken from the pool's ``oem``."""
+    name = "tesserocr"
+
+    def __init__(self, size: int = 1, lang: str = "eng", tessdata: str = None, oem: int = None):
+        import tesserocr
+        self.tesserocr = tesserocr
+        self.size = max(1, size)
+        self.lang = lang
+        self.tessdata = tessdata
+        self.oem = oem
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._apis = []
+        self._lock = threading.Lock()
+
+    def _new_api(self):
+        kwargs = {"lang": self.lang}
+        if self.tessdata:
+            kwargs["path"] = self.tessdata
+        if self.oem is not None:
+            kwargs["oem"] = self.oem  # tesserocr.OEM is an int enum namespace, not a constructor
+        api = self.tesserocr.PyTessBaseAPI(**kwargs)
+        self._apis.append(api)
+        return api
+
+    @contextmanager
+    def _api(self, config: str):
+        with self._lock:
+            grow = self._idle.empty() and self._created < self.size
+            if grow:
+                self._created += 1
+        if grow:
+            try:
+                api = self._new_api()
+            except Exception:
+                # give the slot back, or the next caller waits on a handle that never comes
+                with self._lock:
+                    self._created -= 1
+                raise
+        else:
+            api = self._idle.get()
+        try:
+            m = PSM_REGEX.search(config or "")
+            api.SetPageSegMode(int(m.group(1)) if m else self.tesserocr.PSM.AUTO)
+            yield api
+        finally:
+            api.Clear()
+            self._idle.put(api)
+
+    def image_to_string(self, img, config: str = "") -> str:
+        with self._api(config) as api:
+            api.SetImage(img)
+            return api.GetUTF8Text()
+
+    def image_to_data(self, img, config: str = "") -> dict:
+        RIL = self.tesserocr.RIL
+        data = {k: [] for k in DATA_KEYS}
+        with self._api(config) as api:
+            api.SetImage(img)
+            api.Recognize()
+            it = api.GetIterator()
+            block = par = line = 0
+            while it is not None:
+                if it.IsAtBeginningOf(RIL.BLOCK):
+                    block, par, line = block + 1, 0, 0
+                if it.IsAtBeginningOf(RIL.PARA):
+                    par, line = par + 1, 0
+                if it.IsAtBeginningOf(RIL.TEXTLINE):
+                    line += 1
+                box = it.BoundingBox(RIL.WORD)
+                word = it.GetUTF8Text(RIL.WORD)
+                if box is not None and word is not None:
+                    x0, y0, x1, y1 = box
+                    data["text"].append(word)
+                    data["conf"].append(float(it.Confidence(RIL.WORD)))
+                    data["left"].append(x0)
+                    data["top"].append(y0)
+                    data["width"].append(x1 - x0)
+                    data["height"].append(y1 - y0)
+                    data["page_num"].append(1)
+                    data["block_num"].append(block)
+                    data["par_num"].append(par)
+                    data["line_num"].append(line)
+                if not it.Next(RIL.WORD):
+                    break
+        return data
+
+    def close(self):
+        for api in self._apis:
+            api.End()
+        self._apis = []
+
+BACKENDS = {"pytesseract": PytesseractBackend, "pipe": PipeTesseractBackend, "tesserocr": TesserocrPoolBackend}
+
+def create_backend(name: str, tesseract_cmd: str = None, temp_dir: str = None, pool_size: int = 1,
+                   oem: int = None) -> OCRBackend:
+    # ``oem`` only matters to tesserocr; CLI backends read --oem from each call's config
+    if name == "pytesseract":
+        return PytesseractBackend(tesseract_cmd, temp_dir)
+    if name == "pipe":
+        return PipeTesseractBackend(tesseract_cmd)
+    if name == "tesserocr":
+        return TesserocrPoolBackend(pool_size, oem=oem)
+    raise ValueError(f"Unknown OCR backend: {name!r} (expected one of {', '.join(BACKENDS)})")
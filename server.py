@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import argparse
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+import testing
+
+# ========================
+# Config
+# ========================
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", os.cpu_count() or 1))
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 20 * 1024 * 1024))
+
+# ========================
+# ASGI app
+# ========================
+class CertificateApp:
+    """Minimal ASGI app that keeps the skill/issuer tables loaded and runs
+    analyze_certificate on a bounded executor.
+
+    POST /analyze?filename=cert.pdf with the raw file as the request body
+    (or an ``x-filename`` header) returns the analyze_certificate output.
+    GET /health reports liveness.
+    """
+
+    def __init__(self, workers: int = SERVER_WORKERS, max_upload: int = MAX_UPLOAD_BYTES):
+        self.workers = workers
+        self.max_upload = max_upload
+        self.executor = None
+        self.slots = None
+
+    def startup(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.slots = asyncio.Semaphore(self.workers)
+        # warm the lazily-touched tables and compiled patterns before the first request
+        testing.extract_skills("")
+        testing.fuzzy_lookup_issuer("", testing.ISSUER_DB)
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if self.executor is None:
+            self.startup()
+        path, method = scope["path"], scope["method"]
+        if path == "/health" and method == "GET":
+            await self._respond(send, 200, {"status": "ok"})
+        elif path == "/analyze" and method == "POST":
+            await self._analyze(scope, receive, send)
+        elif path in ("/health", "/analyze"):
+            await self._respond(send, 405, {"error": "Method not allowed"})
+        else:
+            await self._respond(send, 404, {"error": "Not found"})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _analyze(self, scope, receive, send):
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        filename = query.get("filename", [headers.get("x-filename", "")])[0]
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in testing.SUPPORTED_EXTS:
+            await self._respond(send, 400, {"error": "Unsupported file format"})
+            return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body.extend(message.get("body", b""))
+            if len(body) > self.max_upload:
+                await self._respond(send, 413, {"error": "Upload too large"})
+                return
+            if not message.get("more_body", False):
+                break
+
+        async with self.slots:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, _analyze_bytes, bytes(body), ext, filename)
+        await self._respond(send, 200, result)
+
+    async def _respond(self, send, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode("ascii"))]})
+        await send({"type": "http.response.body", "body": body})
+
+def _analyze_bytes(data: bytes, ext: str, filename: str) -> dict:
+    fd, path = tempfile.mkstemp(suffix=ext)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return testing.analyze_certificate(path, name=filename)
+    finally:
+        os.remove(path)
+
+app = CertificateApp()
+
+# ========================
+# CLI
+# ========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("uvicorn is required to serve the app: pip install uvicorn")
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -1,125 +1,1032 @@
+from __future__ import annotations
+
 import re
 import os
 import sys
 import json
+import math
+import asyncio
+import functools
+import glob
+import time
+import hashlib
+import sqlite3
 import argparse
-from PIL import Image, ImageOps, ImageFilter
-import pytesseract
-import fitz  # PyMuPDF
-from rapidfuzz import process as rfp
+import threading
+from contextlib import contextmanager
+from collections import deque
+from dataclasses import dataclass, replace
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from ocr_backends import OCRBackend, OCRResult, OEM_REGEX, PSM_REGEX, create_backend
+from issuer_registry import IssuerRegistry, get_registry
+
+# The OCR stack (PIL, pytesseract, fitz, numpy, rapidfuzz) is imported inside the
+# functions that need it so importing this module stays near-instant.
 
 # ========================
 # Config
 # ========================
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-CUSTOM_TEMP = r"C:\TempOCR"
-os.makedirs(CUSTOM_TEMP, exist_ok=True)
-os.environ['TMP'] = CUSTOM_TEMP
-os.environ['TEMP'] = CUSTOM_TEMP
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Near-duplicate hash geometry (see "Near-duplicate detection" below).
+PHASH_SIZE = 16
+PHASH_BITS = PHASH_SIZE * PHASH_SIZE
+PHASH_BANDS = 8  # a match within the threshold must agree exactly on at least one band
+
+@dataclass
+class Config:
+    """Runtime settings. Defaults come from the environment via ``from_env``;
+    override per process with ``configure(...)``. Nothing is touched until first use."""
+    tesseract_cmd: str = None  # None: `tesseract` on PATH (set TESSERACT_CMD on Windows)
+    temp_dir: str = None  # pytesseract temp files; None: system temp dir
+    skills_path: str = os.path.join(BASE_DIR, "skills_db.json")
+    # issuers.json: names, aliases, verification domains and scores; reloaded on change
+    issuer_registry_path: str = os.path.join(BASE_DIR, "issuers.json")
+    cache_enabled: bool = True
+    cache_dir: str = os.path.join(os.path.expanduser("~"), ".cache", "certificate-ocr")
+    cache_max_bytes: int = 512 * 1024 * 1024
+    # Scanned PDF pages OCR'd concurrently; tesseract runs as a subprocess so threads
+    # suffice. None: min(4, cpus), or 1 in batch workers, which already fill the cores.
+    ocr_page_workers: int = None
+    # "page": OCR only pages without a text layer. "regions": additionally OCR the
+    # embedded images on text pages (names/logos baked into artwork).
+    pdf_ocr_mode: str = "page"
+    # "full": OCR whole images/scanned pages. "roi": cheap layout pass, then OCR text
+    # blocks one by one until issuer, skills and a verification URL are all found.
+    ocr_mode: str = "full"
+    # analyze_certificate_async: certificates processed at once (each may spawn
+    # ocr_page_workers tesseract processes of its own)
+    async_concurrency: int = os.cpu_count() or 1
+    # Per-document caps so huge scanned bundles can't exhaust a worker; 0 disables.
+    # The pixel budget counts rendered OCR pixels (~4.8M for a letter page at
+    # OCR_MAX_DIM) and by default covers max_pdf_pages full scanned pages, so it only
+    # bites on oversized pages; memory is bounded by the in-flight limit regardless.
+    max_pdf_pages: int = 300
+    max_pdf_pixels: int = 300 * 5_000_000
+    # SQLite dHash index of image certificates; an image within phash_threshold bits
+    # of an indexed one is flagged with near_duplicate_of (it is still OCR'd: the same
+    # template with another learner's name hashes just as close). None: off.
+    # The threshold must stay below PHASH_BANDS for the band lookup to be exact.
+    phash_index_path: str = None
+    phash_threshold: int = 4
+    # "pytesseract" (CLI process + temp files per image), "pipe" (CLI process fed
+    # over stdin/stdout, no temp files) or "tesserocr" (pooled C-API handles,
+    # language data loaded once per handle)
+    ocr_backend: str = "pytesseract"
+    # Name from OCR_PROFILES, or a raw tesseract config ("--oem 1 --psm 4") read at
+    # full resolution. With a fallback profile, a page whose mean word confidence is
+    # below ocr_min_confidence is re-read with it, and so is a document whose issuer
+    # can't be found, keeping a fast first pass cheap without losing hard scans.
+    ocr_profile: str = "default"
+    ocr_fallback_profile: str = None
+    ocr_min_confidence: float = 60.0
+    # Re-read pages below ocr_min_confidence with alternative preprocessing
+    # (binarization, deskew, upscaling), keeping the most confident reading.
+    ocr_quality_retry: bool = False
+
+    def __post_init__(self):
+        # checked here so from_env and configure both fail at startup, not per image
+        if not 0 <= self.phash_threshold < PHASH_BANDS:
+            raise ValueError(f"phash_threshold must be in 0..{PHASH_BANDS - 1}, got {self.phash_threshold}")
+
+    @property
+    def page_workers(self) -> int:
+        return self.ocr_page_workers or min(4, os.cpu_count() or 1)
+
+    @classmethod
+    def from_env(cls, env=None):
+        env = os.environ if env is None else env
+        default = cls()
+        return cls(
+            tesseract_cmd=env.get("TESSERACT_CMD") or None,
+            temp_dir=env.get("OCR_TEMP_DIR") or None,
+            skills_path=env.get("SKILLS_DB_PATH", default.skills_path),
+            issuer_registry_path=env.get("ISSUER_REGISTRY_PATH", default.issuer_registry_path),
+            cache_enabled=env.get("OCR_CACHE", "1") != "0",
+            cache_dir=env.get("OCR_CACHE_DIR", default.cache_dir),
+            cache_max_bytes=int(env.get("OCR_CACHE_MAX_BYTES", default.cache_max_bytes)),
+            ocr_page_workers=int(env["OCR_PAGE_WORKERS"]) if env.get("OCR_PAGE_WORKERS") else None,
+            pdf_ocr_mode=env.get("PDF_OCR_MODE", default.pdf_ocr_mode),
+            ocr_mode=env.get("OCR_MODE", default.ocr_mode),
+            async_concurrency=int(env.get("ASYNC_CONCURRENCY", default.async_concurrency)),
+            max_pdf_pages=int(env.get("MAX_PDF_PAGES", default.max_pdf_pages)),
+            max_pdf_pixels=int(env.get("MAX_PDF_PIXELS", default.max_pdf_pixels)),
+            phash_index_path=env.get("PHASH_INDEX") or None,
+            phash_threshold=int(env.get("PHASH_THRESHOLD", default.phash_threshold)),
+            ocr_backend=env.get("OCR_BACKEND", default.ocr_backend),
+            ocr_profile=env.get("OCR_PROFILE", default.ocr_profile),
+            ocr_fallback_profile=env.get("OCR_FALLBACK_PROFILE") or None,
+            ocr_min_confidence=float(env.get("OCR_MIN_CONFIDENCE", default.ocr_min_confidence)),
+            ocr_quality_retry=env.get("OCR_QUALITY_RETRY", "0") == "1",
+        )
+
+CONFIG = Config.from_env()
+_STATE = {}
+_STATE_LOCK = threading.RLock()
+
+def configure(config: Config = None, **overrides) -> Config:
+    # Swap the active config and drop lazily built state so it is rebuilt from it.
+    global CONFIG
+    with _STATE_LOCK:
+        CONFIG = replace(config or CONFIG, **overrides)
+        if _STATE.get("ocr_backend") is not None:
+            _STATE["ocr_backend"].close()
+        _STATE.clear()
+    return CONFIG
+
+def _lazy(name: str, factory):
+    if name not in _STATE:
+        with _STATE_LOCK:
+            if name not in _STATE:
+                _STATE[name] = factory()
+    return _STATE[name]
 
 GENERIC_VERIFY_REGEX = r"(https?:\/\/[^\s]+|\b[A-Z0-9]{5,12}\b)"
 TIME_REGEX = r"(\d+\.?\d*)\s*(?:total\s*)?(hours|hrs|h|weeks|week|months|month)"
 
+OCR_MAX_DIM = 2500
+# Scanned pages are rendered straight at the OCR resolution (longest side OCR_MAX_DIM),
+# capped at this zoom (~288 DPI) so tiny pages aren't blown up into noise.
+PDF_MAX_RENDER_ZOOM = 4
+# Embedded images smaller than this (in PDF points, either side) are not worth OCRing.
+MIN_IMAGE_REGION_PT = 16
+TESSERACT_CONFIG = ""
+# ROI mode: longest side of the layout-pass image, padding around each block crop,
+# and the page segmentation used on crops (a single uniform block of text), which
+# replaces the profile's own --psm.
+ROI_LAYOUT_MAX_DIM = 1000
+ROI_PADDING_PX = 12
+ROI_PSM = 6
+URL_REGEX = re.compile(r"https?:\/\/[^\s]+", re.IGNORECASE)
+# Tesseract settings per OCR pass: config string and the longest image side fed to
+# the engine. "fast" reads a downscaled page as one uniform block; "accurate" uses
+# sparse-text segmentation, which finds the scattered names, dates and codes on
+# decorative certificate layouts that automatic page segmentation skips.
+OCR_PROFILES = {
+    "fast": {"config": "--oem 1 --psm 6", "max_dim": 1600},
+    "default": {"config": TESSERACT_CONFIG, "max_dim": OCR_MAX_DIM},
+    "accurate": {"config": "--oem 1 --psm 11", "max_dim": OCR_MAX_DIM},
+}
+
 # ========================
-# Issuer DB
+# Issuer registry
 # ========================
-ISSUER_DB = {
-    "udemy":20,"coursera":30,"edx":40,"aws":80,"google":75,"microsoft":75,"linkedin":25,
-    "kaggle":50,"pluralsight":35,"datacamp":30,"simplilearn":25,"harvard":95,"stanford":95,
-    "mit":95,"iit":95,"oxford":90,"cambridge":90,"yale":90,"princeton":90,"columbia":90,
-    "caltech":95,"cornell":90,"ucla":85,"nyu":85,"geeksforgeeks":20,"codechef":20,"hackerrank":20,
-    "leetcode":20,"freecodecamp":15,"sololearn":15,"nptel":40,"greatlearning":25,"upgrad":25,
-    "coursera-google":75,"coursera-aws":80,"aws-developer":80,"google-ai":75,"deepmind":85,
-    "ibm":70,"oracle":65,"sap":60,"accenture":50,"tcs":50,"infosys":50,"wipro":50,"capgemini":50,
-    "nasa":95,"spacex":95,"tesla":90,"facebook":75,"meta":75,"twitter":70,"apple":80,
-    "geeksforgeeks-cs":20
-}
+def get_issuer_registry() -> IssuerRegistry:
+    return get_registry(CONFIG.issuer_registry_path)
 
-ISSUER_ALIASES = {
-    "bm developer skills network":"ibm",
-    "ibm skills":"ibm",
-    "oracle university":"oracle",
-    "geeksforgeeks":"geeksforgeeks",
-    "gfg":"geeksforgeeks",
-    "coursera google":"coursera-google",
-    "coursera aws":"coursera-aws"
-}
+def get_issuer_db() -> dict:
+    # canonical name -> reputation; a fresh dict after every registry reload
+    return get_issuer_registry().scores
 
 PROJECT_KEYWORDS = ["capstone", "project", "portfolio", "hands-on", "lab", "practical"]
 ASSESSMENT_KEYWORDS = ["exam", "proctored", "invigilat", "graded", "assess", "final exam", "passing"]
 PREREQ_KEYWORDS = ["prerequisite", "prereq", "prior knowledge", "experience required", "requirement"]
 
+# Every substring flag analyze_certificate needs, resolved together in one scan.
+KEYWORD_FLAGS = {
+    "project": PROJECT_KEYWORDS,
+    "assessment": ASSESSMENT_KEYWORDS,
+    "prerequisite": PREREQ_KEYWORDS,
+    "proctored": ["proct", "invigil"],
+    "capstone": ["capstone", "portfolio"],
+    "blockchain": ["blockchain"],
+}
+
 # ========================
 # Load skills from external JSON
 # ========================
-with open("skills_db.json", "r", encoding="utf-8") as f:
-    SKILL_TAGS = json.load(f)["skills"]
+def _load_skill_tags():
+    with open(CONFIG.skills_path, "r", encoding="utf-8") as f:
+        return json.load(f)["skills"]
+
+def get_skill_tags() -> list:
+    return _lazy("skill_tags", _load_skill_tags)
+
+def _trie_pattern(node: dict) -> str:
+    # Render a character trie as a regex so the engine walks shared prefixes once
+    # instead of trying every skill at every position.
+    terminal = "" in node
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return "(?:" + body + ")?" if terminal else body
+
+class SkillMatcher:
+    """Finds every catalogue skill in a text with one scan, using the same
+    whole-word semantics as a per-skill ``\\b<skill>\\b`` search."""
+
+    def __init__(self, skills: list):
+        self.skills = {}
+        trie = {}
+        for skill in skills:
+            key = skill.lower()
+            self.skills.setdefault(key, []).append(skill)
+            node = trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        # The scan reports the longest skill starting at each position, so shorter
+        # skills that are prefixes of it ("react" in "react native") are re-checked.
+        self.prefixes = {
+            key: [(p, re.compile(r"\b" + re.escape(p) + r"\b")) for p in self.skills if p != key and key.startswith(p)]
+            for key in self.skills
+        }
+        self.regex = re.compile(r"(?=\b(" + _trie_pattern(trie) + r")\b)") if trie else None
+
+    def find(self, text: str) -> list:
+        return self.find_lower(text.lower())
+
+    def find_lower(self, lower_text: str) -> list:
+        if self.regex is None:
+            return []
+        found = set()
+        for m in self.regex.finditer(lower_text):
+            key = m.group(1)
+            found.add(key)
+            for prefix, regex in self.prefixes[key]:
+                if regex.match(lower_text, m.start()):
+                    found.add(prefix)
+        return [skill for key in self.skills if key in found for skill in self.skills[key]]
+
+def get_skill_matcher() -> SkillMatcher:
+    return _lazy("skill_matcher", lambda: SkillMatcher(get_skill_tags()))
+
+# ========================
+# Instrumentation
+# ========================
+class Timings:
+    """Wall time per pipeline stage plus size counters for one analyze_certificate
+    call. Stage times are summed, so OCR done on several page threads can exceed
+    the call's total. Safe to update from worker threads."""
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def count(self, name: str, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self) -> dict:
+        return {"stages_ms": {k: round(v * 1000, 3) for k, v in self.stages.items()},
+                "counters": dict(self.counters)}
+
+class _NullTimings:
+    # stand-in when instrumentation is off, so the hot path needs no branches
+    @contextmanager
+    def stage(self, name: str):
+        yield
+
+    def count(self, name: str, value=1):
+        pass
+
+NULL_TIMINGS = _NullTimings()
+
+class TimingHistogram:
+    """Aggregates ``timings`` dicts across a batch into fixed log-spaced buckets
+    (four per doubling), so memory stays constant however many results are added."""
+
+    BUCKETS_PER_DOUBLING = 4
+
+    def __init__(self):
+        self.buckets = {}
+        self.totals = {}
+
+    def _bucket(self, ms: float) -> int:
+        return math.ceil(math.log2(max(ms, 0.001)) * self.BUCKETS_PER_DOUBLING)
+
+    def add(self, timings: dict):
+        for name, ms in timings.get("stages_ms", {}).items():
+            hist = self.buckets.setdefault(name, {})
+            b = self._bucket(ms)
+            hist[b] = hist.get(b, 0) + 1
+            count, total, peak = self.totals.get(name, (0, 0.0, 0.0))
+            self.totals[name] = (count + 1, total + ms, max(peak, ms))
+
+    def percentile(self, name: str, q: float) -> float:
+        # upper edge of the bucket holding the q-th quantile
+        hist = self.buckets.get(name, {})
+        target = q * sum(hist.values())
+        seen = 0
+        for b in sorted(hist):
+            seen += hist[b]
+            if seen >= target:
+                return 2 ** (b / self.BUCKETS_PER_DOUBLING)
+        return 0.0
+
+    def summary(self) -> dict:
+        out = {}
+        for name, (count, total, peak) in self.totals.items():
+            out[name] = {"count": count, "mean_ms": round(total / count, 3),
+                         "p50_ms": round(min(self.percentile(name, 0.50), peak), 3),
+                         "p95_ms": round(min(self.percentile(name, 0.95), peak), 3),
+                         "max_ms": round(peak, 3)}
+        return out
 
 # ========================
 # Utilities
 # ========================
+def get_ocr_backend() -> OCRBackend:
+    # Built on the first OCR call, once per process; pooled backends keep their
+    # engines (and loaded language data) for the life of the worker.
+    return _lazy("ocr_backend", _create_ocr_backend)
+
+def _create_ocr_backend() -> OCRBackend:
+    # tesserocr fixes the engine mode per handle, so take it from the main profile
+    oem = OEM_REGEX.search(ocr_profile(CONFIG.ocr_profile)["config"])
+    return create_backend(CONFIG.ocr_backend, CONFIG.tesseract_cmd, CONFIG.temp_dir,
+                          pool_size=max(CONFIG.page_workers, CONFIG.async_concurrency),
+                          oem=int(oem.group(1)) if oem else None)
+
+def ocr_profile(name: str, psm=None) -> dict:
+    settings = OCR_PROFILES.get(name) or {"config": name, "max_dim": OCR_MAX_DIM}
+    if psm is None:
+        return settings
+    config = settings["config"]
+    config = PSM_REGEX.sub(f"--psm {psm}", config) if PSM_REGEX.search(config) else f"{config} --psm {psm}".strip()
+    return dict(settings, config=config)
+
+def _profile_image(img: Image.Image, profile: dict) -> Image.Image:
+    from PIL import Image
+    scale = profile["max_dim"] / max(img.size)
+    if scale >= 1:
+        return img
+    return img.resize((max(1, int(img.size[0]*scale)), max(1, int(img.size[1]*scale))), Image.LANCZOS)
+
 def preprocess_pil_image(img: Image.Image) -> Image.Image:
+    from PIL import Image, ImageOps, ImageFilter
     img = img.convert("L")
     img = ImageOps.autocontrast(img)
     img = img.filter(ImageFilter.MedianFilter(size=3))
     img = img.filter(ImageFilter.SHARPEN)
-    max_dim = 2500
+    max_dim = OCR_MAX_DIM
     if max(img.size) > max_dim:
         scale = max_dim / max(img.size)
         img = img.resize((int(img.size[0]*scale), int(img.size[1]*scale)), Image.LANCZOS)
     return img
 
-def ocr_image(img: Image.Image) -> str:
-    img = preprocess_pil_image(img)
-    return pytesseract.image_to_string(img)
+def ocr_image(img: Image.Image, timings=NULL_TIMINGS, preprocessed=False, profile=None,
+              with_confidence=False):
+    # Text of the image, or with `with_confidence` an OCRResult carrying word confidences.
+    if not preprocessed:
+        with timings.stage("preprocess"):
+            img = preprocess_pil_image(img)
+    return _ocr_preprocessed(img, timings, profile, with_confidence)
+
+def recognize(img: Image.Image, profile=None, timings=NULL_TIMINGS, psm=None) -> OCRResult:
+    # One pass of the named profile returning text, word boxes and confidences.
+    settings = ocr_profile(profile or CONFIG.ocr_profile, psm)
+    return _recognize(_profile_image(img, settings), settings["config"], timings)
+
+def _recognize(img: Image.Image, config: str, timings=NULL_TIMINGS) -> OCRResult:
+    timings.count("ocr_pixels", img.size[0] * img.size[1])
+    with timings.stage("ocr"):
+        return get_ocr_backend().recognize(img, config)
+
+def _ocr_preprocessed(img: Image.Image, timings=NULL_TIMINGS, profile=None, with_confidence=False, psm=None):
+    # `psm` overrides the profile's page segmentation (ROI block crops)
+    fallback = CONFIG.ocr_fallback_profile
+    cascade = profile is None and fallback and fallback != CONFIG.ocr_profile
+    if not (cascade or with_confidence or CONFIG.ocr_quality_retry):
+        settings = ocr_profile(profile or CONFIG.ocr_profile, psm)
+        scaled = _profile_image(img, settings)
+        timings.count("ocr_pixels", scaled.size[0] * scaled.size[1])
+        with timings.stage("ocr"):
+            text = get_ocr_backend().image_to_string(scaled, settings["config"])
+        timings.count("ocr_chars", len(text))
+        return text
+    # a blank page or a logo reads as no words at all, not as a doubtful reading,
+    # so it isn't sent through the retries
+    unsure = lambda r: bool(r.words) and r.confidence < CONFIG.ocr_min_confidence
+    result = recognize(img, profile, timings, psm)
+    if cascade and unsure(result):
+        # cascade: cheap first pass, slow retry only when the engine wasn't sure
+        timings.count("ocr_fallbacks")
+        profile = fallback
+        result = recognize(img, profile, timings, psm)
+    if CONFIG.ocr_quality_retry and unsure(result):
+        result = _quality_retry(img, result, profile, timings, psm)
+    if unsure(result):
+        timings.count("ocr_low_confidence")
+    timings.count("ocr_chars", len(result.text))
+    return result if with_confidence else result.text
+
+# ========================
+# Alternative preprocessing
+# ========================
+# Only tried on pages read with low confidence: each variant costs a full OCR pass.
+DESKEW_MAX_ANGLE = 5.0
+DESKEW_STEP = 0.5
+DESKEW_SAMPLE_DIM = 800
+UPSCALE_FACTOR = 1.5
+# A variant must read at least this share of the original reading's words to
+# replace it: binarizing or deskewing a faint scan tends to drop the weak words,
+# and the few left are read confidently.
+RETRY_MIN_WORD_SHARE = 0.8
+
+def otsu_threshold(img: Image.Image) -> int:
+    import numpy as np
+    hist = np.bincount(np.asarray(img, dtype=np.uint8).ravel(), minlength=256).astype(np.float64)
+    weight = np.cumsum(hist)
+    mass = np.cumsum(hist * np.arange(256))
+    total = weight[-1]
+    # between-class variance for every cut, up to a constant factor
+    between = (mass[-1] * weight - mass * total) ** 2 / np.maximum(weight * (total - weight), 1)
+    return int(np.argmax(between))
+
+def binarize_image(img: Image.Image) -> Image.Image:
+    t = otsu_threshold(img)
+    return img.point(lambda v: 255 if v > t else 0)
+
+def skew_angle(img: Image.Image) -> float:
+    # Angle (degrees, PIL rotate convention) that makes text lines horizontal: the
+    # one whose row-ink profile has the sharpest line/gap transitions.
+    import numpy as np
+    small = img.copy()
+    small.thumbnail((DESKEW_SAMPLE_DIM, DESKEW_SAMPLE_DIM))
+    t = otsu_threshold(small)
+    ink = small.point(lambda v: 255 if v <= t else 0)
+    best, best_score = 0.0, -1.0
+    for angle in np.arange(-DESKEW_MAX_ANGLE, DESKEW_MAX_ANGLE + DESKEW_STEP / 2, DESKEW_STEP):
+        rows = np.asarray(ink.rotate(float(angle), fillcolor=0), dtype=np.float64).sum(axis=1)
+        score = float(np.sum(np.diff(rows) ** 2))
+        if score > best_score:
+            best, best_score = float(angle), score
+    return best
+
+def deskew_image(img: Image.Image) -> Image.Image:
+    from PIL import Image
+    angle = skew_angle(img)
+    return img.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255) if angle else img
+
+def upscale_image(img: Image.Image) -> Image.Image:
+    from PIL import Image
+    return img.resize((int(img.size[0]*UPSCALE_FACTOR), int(img.size[1]*UPSCALE_FACTOR)), Image.LANCZOS)
+
+PREPROCESS_VARIANTS = [("binarize", binarize_image), ("deskew", deskew_image), ("upscale", upscale_image)]
+
+def _quality_retry(img: Image.Image, result: OCRResult, profile=None, timings=NULL_TIMINGS, psm=None) -> OCRResult:
+    # Re-read the page through each variant in turn, keeping the most confident
+    # reading and stopping as soon as one clears the threshold.
+    settings = ocr_profile(profile or CONFIG.ocr_profile, psm)
+    base = _profile_image(img, settings)
+    min_words = RETRY_MIN_WORD_SHARE * len(result.words)
+    for name, variant in PREPROCESS_VARIANTS:
+        with timings.stage("preprocess_retry"):
+            candidate = variant(base)
+        timings.count("ocr_quality_retries")
+        retry = _recognize(candidate, settings["config"], timings)
+        if len(retry.words) >= min_words and retry.confidence > result.confidence:
+            result = retry
+        if result.confidence >= CONFIG.ocr_min_confidence:
+            break
+    return result
+
+def layout_blocks(img: Image.Image, timings=NULL_TIMINGS) -> list:
+    # Text block boxes (left, top, right, bottom in img coordinates) from a
+    # low-resolution image_to_data pass, top to bottom.
+    scale = min(1.0, ROI_LAYOUT_MAX_DIM / max(img.size))
+    small = img.resize((max(1, int(img.size[0]*scale)), max(1, int(img.size[1]*scale)))) if scale < 1 else img
+    with timings.stage("layout"):
+        data = get_ocr_backend().image_to_data(small, TESSERACT_CONFIG)
+    boxes = {}
+    for i, word in enumerate(data["text"]):
+        if not word.strip():
+            continue
+        x0, y0 = data["left"][i], data["top"][i]
+        x1, y1 = x0 + data["width"][i], y0 + data["height"][i]
+        key = (data["page_num"][i], data["block_num"][i])
+        b = boxes.get(key)
+        boxes[key] = (x0, y0, x1, y1) if b is None else (min(b[0], x0), min(b[1], y0), max(b[2], x1), max(b[3], y1))
+    width, height = img.size
+    pad = ROI_PADDING_PX
+    blocks = [(max(0, int(x0/scale) - pad), max(0, int(y0/scale) - pad),
+               min(width, int(x1/scale) + pad), min(height, int(y1/scale) + pad))
+              for x0, y0, x1, y1 in boxes.values()]
+    return sorted(blocks, key=lambda b: (b[1], b[0]))
+
+def roi_resolved(text: str) -> bool:
+    return (URL_REGEX.search(text) is not None and bool(extract_skills(text))
+            and fuzzy_lookup_issuer(text)[0] is not None)
+
+def ocr_image_roi(img: Image.Image, timings=NULL_TIMINGS, preprocessed=False) -> str:
+    if not preprocessed:
+        with timings.stage("preprocess"):
+            img = preprocess_pil_image(img)
+    blocks = layout_blocks(img, timings)
+    if not blocks:
+        # the layout pass found nothing to crop; read the whole image instead
+        return _ocr_preprocessed(img, timings)
+    parts = []
+    for box in blocks:
+        timings.count("ocr_regions")
+        # same profile, cascade and quality retry as full pages, segmented as one block
+        parts.append(_ocr_preprocessed(img.crop(box), timings, psm=ROI_PSM))
+        if roi_resolved("\n".join(parts)):
+            timings.count("roi_early_exit")
+            break
+    return "\n".join(parts)
+
+def ocr_page(img: Image.Image, timings=NULL_TIMINGS, preprocessed=False, profile=None) -> str:
+    # whole-page OCR entry point for image files and scanned PDF pages; an explicit
+    # profile (the document-level retry) always reads the whole page
+    if CONFIG.ocr_mode == "roi" and profile is None:
+        return ocr_image_roi(img, timings, preprocessed)
+    return ocr_image(img, timings, preprocessed, profile)
+
+# ========================
+# OCR cache
+# ========================
+class OCRCache:
+    """On-disk cache of extracted text keyed by file content and OCR settings.
+    Entries are evicted least-recently-used once the directory exceeds ``max_bytes``."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+
+    def key(self, file_path: str, kind: str, profile=None) -> str:
+        h = hashlib.sha256()
+        fallback = None if profile else CONFIG.ocr_fallback_profile
+        settings = {"kind": kind, "max_dim": OCR_MAX_DIM, "max_render_zoom": PDF_MAX_RENDER_ZOOM,
+                    "pdf_ocr_mode": CONFIG.pdf_ocr_mode, "ocr_mode": None if profile else CONFIG.ocr_mode,
+                    "ocr_backend": CONFIG.ocr_backend, "max_pdf_pages": CONFIG.max_pdf_pages,
+                    "max_pdf_pixels": CONFIG.max_pdf_pixels,
+                    "tesseract_config": TESSERACT_CONFIG,
+                    "ocr_profile": ocr_profile(profile or CONFIG.ocr_profile),
+                    "ocr_fallback_profile": fallback and ocr_profile(fallback),
+                    "ocr_quality_retry": CONFIG.ocr_quality_retry,
+                    "ocr_min_confidence": (fallback or CONFIG.ocr_quality_retry) and CONFIG.ocr_min_confidence}
+        h.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".txt")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)  # mtime doubles as the LRU clock
+            return text
+        except OSError:
+            return None
+
+    def put(self, key: str, text: str):
+        # Best effort: an unwritable or full cache dir must not cost the caller the text.
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+            self._account(path)
+        except OSError as e:
+            print(f"OCR cache: could not store {path}:", e, file=sys.stderr)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def _account(self, path: str):
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += os.path.getsize(path)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".txt"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+def get_ocr_cache():
+    return _lazy("ocr_cache", lambda: OCRCache(CONFIG.cache_dir, CONFIG.cache_max_bytes) if CONFIG.cache_enabled else None)
+
+def cached_extract(file_path: str, kind: str, extractor, timings=NULL_TIMINGS, profile=None) -> str:
+    # `extractor(file_path, errors)` appends to `errors` for parts it had to skip;
+    # such partial text is returned but never cached
+    cache = get_ocr_cache()
+    if cache is None:
+        return extractor(file_path, [])
+    with timings.stage("cache_lookup"):
+        key = cache.key(file_path, kind, profile)
+        text = cache.get(key)
+    timings.count("cache_hits", int(text is not None))
+    if text is None:
+        errors = []
+        text = extractor(file_path, errors)
+        if not errors:
+            cache.put(key, text)
+    return text
 
 # ========================
 # PDF/Image extraction
 # ========================
-def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
-    try:
+def render_zoom(rect) -> float:
+    # -1px leaves room for fitz rounding the pixmap outward, so preprocess_pil_image
+    # never has to LANCZOS-resize what we just rendered
+    return min(PDF_MAX_RENDER_ZOOM, (OCR_MAX_DIM - 1) / max(rect.width, rect.height))
+
+def image_regions(page) -> list:
+    # Bounding boxes of the images drawn on a page, clipped to it, deduplicated and
+    # minus slivers too small to hold text.
+    regions = []
+    for info in page.get_image_info():
+        clip = page.rect & info["bbox"]
+        if clip.width < MIN_IMAGE_REGION_PT or clip.height < MIN_IMAGE_REGION_PT:
+            continue
+        if clip not in regions:
+            regions.append(clip)
+    return regions
+
+def iter_pdf_pages(file_path: str, max_workers=None, timings=NULL_TIMINGS, profile=None, errors=None):
+    """Yields the text of a PDF piece by piece, in page order: each page's text layer
+    and the OCR of each rendered page/region. At most ``2 * max_workers`` rendered
+    images are alive at once, pixmaps are freed as soon as they are copied out, and
+    the document stops at ``CONFIG.max_pdf_pages`` pages / ``CONFIG.max_pdf_pixels``
+    rendered pixels. A page or region that fails yields "" and its exception is
+    appended to ``errors``, so one bad page doesn't lose the rest of the document."""
+    import fitz  # PyMuPDF
+    from PIL import Image
+    max_workers = max_workers or CONFIG.page_workers
+    pixels_left, over_budget = CONFIG.max_pdf_pixels, 0
+    parts, in_flight = deque(), 0
+    errors = [] if errors is None else errors
+    with timings.stage("pdf_open"):
         doc = fitz.open(file_path)
-        for page in doc:
-            page_text = page.get_text()
+
+    def failed(e):
+        errors.append(e)
+        timings.count("parts_failed")
+        print(f"PDF extraction: page error in {file_path}:", e, file=sys.stderr)
+        return ""
+
+    def result(future):
+        try:
+            return future.result()
+        except Exception as e:
+            return failed(e)
+
+    with doc, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        def submit(page, clip, ocr=ocr_image):
+            nonlocal pixels_left, over_budget, in_flight
+            zoom = render_zoom(clip)
+            pixels = math.ceil(clip.width * zoom) * math.ceil(clip.height * zoom)
+            if CONFIG.max_pdf_pixels:
+                if pixels > pixels_left:
+                    timings.count("ocr_skipped_pixel_budget")
+                    over_budget += 1
+                    return
+                pixels_left -= pixels
+            # fitz is not thread-safe, so render here and only hand OCR to the pool
+            try:
+                with timings.stage("render"):
+                    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, colorspace=fitz.csGRAY, alpha=False)
+                    img = Image.frombytes("L", [pix.width, pix.height], pix.samples)
+                    del pix  # img holds its own copy of the samples
+            except Exception as e:
+                parts.append(failed(e))
+                return
+            parts.append(pool.submit(ocr, img, timings, profile=profile))
+            in_flight += 1
+
+        def ready():
+            # head of the queue can be emitted without waiting, or we must wait because
+            # rendered pages are piling up faster than tesseract consumes them
+            head = parts[0]
+            return isinstance(head, str) or head.done() or in_flight > 2 * max_workers
+
+        for pno, page in enumerate(doc):
+            if CONFIG.max_pdf_pages and pno >= CONFIG.max_pdf_pages:
+                timings.count("pages_truncated", len(doc) - pno)
+                print(f"PDF extraction: {file_path} truncated to {CONFIG.max_pdf_pages} of {len(doc)} pages", file=sys.stderr)
+                break
+            timings.count("pages")
+            try:
+                with timings.stage("text_layer"):
+                    page_text = page.get_text()
+            except Exception as e:
+                failed(e)
+                page_text = ""  # no usable text layer: try OCR instead
             if page_text and page_text.strip():
-                text += page_text + "\n"
+                parts.append(page_text)
+                if CONFIG.pdf_ocr_mode == "regions":
+                    for clip in image_regions(page):
+                        timings.count("ocr_regions")
+                        submit(page, clip)
             else:
-                mat = fitz.Matrix(2,2)
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                text += ocr_image(img) + "\n"
+                timings.count("ocr_pages")
+                submit(page, page.rect, ocr_page)
+            del page
+            while parts and ready():
+                part = parts.popleft()
+                if not isinstance(part, str):
+                    in_flight -= 1
+                    part = result(part)
+                yield part
+        if over_budget:
+            print(f"PDF extraction: {file_path} skipped OCR of {over_budget} page(s)/region(s) "
+                  f"over the {CONFIG.max_pdf_pixels} pixel budget", file=sys.stderr)
+        while parts:
+            part = parts.popleft()
+            yield part if isinstance(part, str) else result(part)
+
+def _extract_text_from_pdf(file_path: str, max_workers=None, timings=NULL_TIMINGS, profile=None, errors=None) -> str:
+    return "".join(part + "\n" for part in iter_pdf_pages(file_path, max_workers, timings, profile, errors))
+
+def _extract_text_from_image(img_path: str, timings=NULL_TIMINGS, preprocessed_img=None, profile=None) -> str:
+    from PIL import Image
+    if preprocessed_img is not None:
+        return ocr_page(preprocessed_img, timings, preprocessed=True, profile=profile)
+    with timings.stage("image_open"):
+        img = Image.open(img_path)
+        img.load()
+    return ocr_page(img, timings, profile=profile)
+
+def extract_text_from_pdf(file_path: str, max_workers=None, timings=NULL_TIMINGS, profile=None) -> str:
+    # `profile`: force one OCR profile (no cascade) instead of CONFIG.ocr_profile
+    try:
+        return cached_extract(file_path, "pdf", lambda p, errors: _extract_text_from_pdf(p, max_workers, timings, profile, errors),
+                              timings, profile)
     except Exception as e:
-        print("PDF extraction error:", e)
-    return text
+        print("PDF extraction error:", e, file=sys.stderr)
+        return ""
 
-def extract_text_from_image(img_path: str) -> str:
+def extract_text_from_image(img_path: str, timings=NULL_TIMINGS, preprocessed_img=None, profile=None) -> str:
+    # `preprocessed_img`: the image already opened and run through preprocess_pil_image
     try:
-        img = Image.open(img_path)
-        return ocr_image(img)
+        return cached_extract(img_path, "image", lambda p, errors: _extract_text_from_image(p, timings, preprocessed_img, profile),
+                              timings, profile)
     except Exception as e:
-        print("OCR Image error:", e)
+        print("OCR Image error:", e, file=sys.stderr)
         return ""
 
+# ========================
+# Near-duplicate detection
+# ========================
+# 16x16 gradient grid (256 bits): certificates share templates and mostly-white
+# layouts, and the classic 8x8 dHash can't tell different certificates apart.
+# PHASH_SIZE/PHASH_BANDS are defined with the config, which validates against them.
+
+def dhash(img: Image.Image) -> int:
+    # difference hash: brightness gradient between horizontal neighbours on a thumbnail
+    from PIL import Image
+    small = img.convert("L").resize((PHASH_SIZE + 1, PHASH_SIZE), Image.BILINEAR)
+    px = list(small.getdata())
+    bits = 0
+    for row in range(PHASH_SIZE):
+        for col in range(PHASH_SIZE):
+            i = row * (PHASH_SIZE + 1) + col
+            bits = (bits << 1) | (px[i] > px[i + 1])
+    return bits
+
+def _phash_hex(h: int) -> str:
+    return f"{h:0{PHASH_BITS // 4}x}"
+
+def _bands(h: int) -> list:
+    bounds = [round(PHASH_BITS * i / PHASH_BANDS) for i in range(PHASH_BANDS + 1)]
+    return [(h >> lo) & ((1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:])]
+
+class PHashIndex:
+    """SQLite index of dHashes of preprocessed certificate images and the files
+    they came from. Lookups use band columns (multi-index hashing): two hashes
+    within ``PHASH_BANDS - 1`` bits share at least one band exactly, so only rows
+    matching a band are compared."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            bands = ", ".join(f"b{i} INTEGER" for i in range(PHASH_BANDS))
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS phashes (hash TEXT, {bands}, file TEXT)")
+            for i in range(PHASH_BANDS):
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS phashes_b{i} ON phashes (b{i})")
+        return self._conn
+
+    def __getstate__(self):
+        return {"path": self.path, "_conn": None}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def query(self, h: int, threshold: int):
+        # Closest stored (file, distance) within threshold, else None.
+        if threshold >= PHASH_BANDS:
+            raise ValueError(f"phash threshold must be below PHASH_BANDS ({PHASH_BANDS})")
+        where = " OR ".join(f"b{i} = ?" for i in range(PHASH_BANDS))
+        with self._lock:
+            rows = self.conn.execute(f"SELECT hash, file FROM phashes WHERE {where}", _bands(h)).fetchall()
+        best = None
+        for stored, file_path in rows:
+            distance = bin(int(stored, 16) ^ h).count("1")
+            if distance <= threshold and (best is None or distance < best[1]):
+                best = (file_path, distance)
+        return best
+
+    def add(self, h: int, file_path: str):
+        # named columns: indexes created before the result column was dropped still accept this
+        columns = ", ".join(f"b{i}" for i in range(PHASH_BANDS))
+        with self._lock, self.conn:
+            self.conn.execute(f"INSERT INTO phashes (hash, {columns}, file) VALUES (?, {', '.join('?' * PHASH_BANDS)}, ?)",
+                              [_phash_hex(h), *_bands(h), file_path])
+
+def get_phash_index():
+    return _lazy("phash_index", lambda: PHashIndex(CONFIG.phash_index_path) if CONFIG.phash_index_path else None)
+
+def preprocess_and_hash(img_path: str, timings=NULL_TIMINGS):
+    from PIL import Image
+    with timings.stage("image_open"):
+        img = Image.open(img_path)
+        img.load()
+    with timings.stage("preprocess"):
+        img = preprocess_pil_image(img)
+    with timings.stage("phash"):
+        return img, dhash(img)
+
 # ========================
 # Feature extraction
 # ========================
+GENERIC_VERIFY_RE = re.compile(GENERIC_VERIFY_REGEX, re.IGNORECASE)
+TIME_RE = re.compile(TIME_REGEX, re.IGNORECASE)
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+REGISTRY_LINK_HINTS = ['verify', 'certificate', 'registry', 'credentials']
+# Hosts of links in lowercased text: after a scheme, or a bare domain followed by a
+# path ("coursera.org/verify/..."), as OCR often drops or mangles the scheme.
+LINK_HOST_RE = re.compile(r"https?://([a-z0-9.-]+)|\b((?:[a-z0-9-]+\.)+[a-z]{2,})/")
+
+class KeywordScanner:
+    """Substring flags for several keyword groups from a single regex scan of
+    lowercased text. At each position the longest keyword wins, and every shorter
+    keyword it contains ("exam" in "final exam", "proct" in "proctored") is
+    credited too, so results equal ``any(k in text for k in group)`` per group."""
+
+    def __init__(self, groups: dict):
+        self.groups = groups
+        keywords = sorted({k for ks in groups.values() for k in ks}, key=len, reverse=True)
+        self.regex = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+        self.implied = {m: frozenset(flag for flag, ks in groups.items() if any(k in m for k in ks))
+                        for m in keywords}
+
+    def scan(self, lower_text: str) -> set:
+        flags = set()
+        for m in self.regex.finditer(lower_text):
+            flags |= self.implied[m.group(1)]
+            if len(flags) == len(self.groups):
+                break
+        return flags
+
+KEYWORD_SCANNER = KeywordScanner(KEYWORD_FLAGS)
+
 def find_verification_link(text: str):
-    match = re.search(GENERIC_VERIFY_REGEX, text, re.IGNORECASE)
+    match = GENERIC_VERIFY_RE.search(text)
     return match.group(0).strip() if match else None
 
-def fuzzy_lookup_issuer(ocr_text: str, issuer_db: dict):
-    text = ocr_text.lower()
-    for alias, name in ISSUER_ALIASES.items():
-        if alias in text:
-            return name, issuer_db.get(name, 25)
-    best = rfp.extractOne(text, list(issuer_db.keys()), score_cutoff=30)
-    if best:
-        return best[0], issuer_db.get(best[0], 25)
+def _tokens(text: str) -> list:
+    return TOKEN_RE.findall(text.lower())
+
+class IssuerIndex:
+    """Token index over issuer names and aliases. Text is matched window by window
+    (n-grams up to the longest indexed name) so cost depends on the document length
+    and the handful of candidates sharing a token prefix, not on the number of issuers."""
+
+    FUZZY_CUTOFF = 85
+    MIN_FUZZY_LEN = 4
+
+    def __init__(self, issuer_db: dict, aliases: dict):
+        self.phrases = {}
+        for name in issuer_db:
+            self.phrases.setdefault(tuple(_tokens(name)), name)
+        for alias, name in aliases.items():
+            self.phrases[tuple(_tokens(alias))] = name
+        self.phrases.pop((), None)
+        self.max_n = max((len(p) for p in self.phrases), default=0)
+        self.blocks = {}
+        for phrase in self.phrases:
+            for tok in phrase:
+                self.blocks.setdefault(tok[:2], set()).add(phrase)
+
+    def lookup(self, text: str):
+        return self.lookup_lower(text.lower())
+
+    def lookup_lower(self, lower_text: str):
+        tokens = TOKEN_RE.findall(lower_text)
+        # longest (most specific) name wins, then the earliest occurrence
+        for n in range(self.max_n, 0, -1):
+            for i in range(len(tokens) - n + 1):
+                phrase = tuple(tokens[i:i+n])
+                if phrase in self.phrases:
+                    return self.phrases[phrase]
+        return self._fuzzy(tokens)
+
+    def _fuzzy(self, tokens: list):
+        # OCR noise fallback: compare each window only against names that share a token prefix
+        from rapidfuzz import process as rfp, fuzz
+        best = None
+        seen = set()
+        for n in range(1, self.max_n + 1):
+            for i in range(len(tokens) - n + 1):
+                window = tuple(tokens[i:i+n])
+                if window in seen or len("".join(window)) < self.MIN_FUZZY_LEN:
+                    continue
+                seen.add(window)
+                candidates = set()
+                for tok in window:
+                    candidates |= self.blocks.get(tok[:2], set())
+                candidates = [" ".join(p) for p in candidates if len(p) == n]
+                if not candidates:
+                    continue
+                match = rfp.extractOne(" ".join(window), candidates, scorer=fuzz.ratio, score_cutoff=self.FUZZY_CUTOFF)
+                if match and (best is None or match[1] > best[1]):
+                    best = (match[0], match[1])
+        return self.phrases[tuple(best[0].split())] if best else None
+
+def get_issuer_index() -> IssuerIndex:
+    # rebuilt whenever the registry has reloaded issuers.json
+    registry = get_issuer_registry()
+    cached = _STATE.get("issuer_index")
+    if cached is None or cached[0] != registry.version:
+        with _STATE_LOCK:
+            cached = _STATE.get("issuer_index")
+            if cached is None or cached[0] != registry.version:
+                cached = _STATE["issuer_index"] = (registry.version, IssuerIndex(registry.scores, registry.aliases))
+    return cached[1]
+
+def issuer_from_links(lower_text: str, registry: IssuerRegistry = None):
+    # Exact domain -> issuer probe for each link host; parent domains are tried too
+    # so "verify.coursera.org" resolves via "coursera.org".
+    registry = registry or get_issuer_registry()
+    for m in LINK_HOST_RE.finditer(lower_text):
+        name = registry.by_domain(m.group(1) or m.group(2))
+        if name:
+            return name
+    return None
+
+def fuzzy_lookup_issuer(ocr_text: str, issuer_db: dict = None):
+    return _lookup_issuer_lower(ocr_text.lower(), issuer_db)
+
+def _lookup_issuer_lower(lower_text: str, issuer_db: dict = None):
+    registry = get_issuer_registry()
+    shared = issuer_db is None or issuer_db is registry.scores
+    if shared:
+        issuer_db = registry.scores
+    # a link on an issuer-owned domain beats guessing from the text
+    name = issuer_from_links(lower_text, registry)
+    if name is None or name not in issuer_db:
+        index = get_issuer_index() if shared else IssuerIndex(issuer_db, registry.aliases)
+        name = index.lookup_lower(lower_text)
+    if name:
+        return name, issuer_db.get(name, 25)
     return None, 25
 
 def extract_time_commitment(ocr_text: str):
-    m = re.search(TIME_REGEX, ocr_text, re.IGNORECASE)
+    m = TIME_RE.search(ocr_text)
     if not m: return 0
     val = float(m.group(1))
     unit = m.group(2).lower()
@@ -132,31 +1039,31 @@ def detect_keywords(ocr_text: str, keywords: list) -> bool:
     return any(k in text for k in keywords)
 
 def guess_verification_method(ocr_text: str, verification_link: str):
-    text = ocr_text.lower()
-    if 'proct' in text or 'invigil' in text:
+    return _verification_method(KEYWORD_SCANNER.scan(ocr_text.lower()), verification_link)
+
+def _verification_method(flags: set, verification_link: str):
+    if 'proctored' in flags:
         return 'proctored'
-    if 'blockchain' in text:
+    if 'blockchain' in flags:
         return 'blockchain'
     if verification_link:
-        if any(x in verification_link.lower() for x in ['verify', 'certificate', 'registry', 'credentials']):
+        if any(x in verification_link.lower() for x in REGISTRY_LINK_HINTS):
             return 'registry'
         return 'simple_link'
     return 'none'
 
 def extract_skills(text: str):
-    found_skills = []
-    lower_text = text.lower()
-    for skill in SKILL_TAGS:
-        # match whole word/phrase only
-        if re.search(r"\b" + re.escape(skill.lower()) + r"\b", lower_text):
-            found_skills.append(skill)
-    return list(set(found_skills))
+    # match whole word/phrase only
+    return get_skill_matcher().find(text)
 
 # ========================
 # Tier calculation
 # ========================
+TIER_WEIGHTS = {"issuer_rep":0.35,"assessment":0.25,"project":0.20,"time":0.10,"industry":0.10,"prereq":0.0}
+TIER_THRESHOLDS = [(80, 1), (60, 2), (40, 3)]
+
 def compute_certificate_tier(features, issuer_db=None):
-    if issuer_db is None: issuer_db = ISSUER_DB
+    if issuer_db is None: issuer_db = get_issuer_db()
     issuer_rep = features.get("issuer_rep", 25)
     time_h = float(features.get("duration_hours", 0))
     assessment = float(features.get("assessment_rigor", 20))
@@ -167,7 +1074,7 @@ def compute_certificate_tier(features, issuer_db=None):
     time_score = max(0, min(100, (time_h/200.0)*100))
     verify_bonus = 10 if features.get("verified", False) else 0
     project_score = proj_comp if proj_req else 0
-    weights = {"issuer_rep":0.35,"assessment":0.25,"project":0.20,"time":0.10,"industry":0.10,"prereq":0.0}
+    weights = TIER_WEIGHTS
     composite = (
         issuer_rep*weights["issuer_rep"]+
         assessment*weights["assessment"]+
@@ -178,34 +1085,175 @@ def compute_certificate_tier(features, issuer_db=None):
     )
     composite += verify_bonus
     score = max(0, min(100, composite))
-    if score >= 80: tier=1
-    elif score >= 60: tier=2
-    elif score >= 40: tier=3
-    else: tier=4
+    tier = next((t for threshold, t in TIER_THRESHOLDS if score >= threshold), 4)
     return {"score":round(score,2),"tier":tier}
 
+def _column(columns, key, default, n):
+    import numpy as np
+    names = getattr(getattr(columns, "dtype", None), "names", None)
+    if names is not None:  # structured array: fields by name
+        col = columns[key] if key in names else None
+    else:  # dict or DataFrame
+        col = columns.get(key)
+    if col is None:
+        return np.full(n, default, dtype=np.float64)
+    return np.asarray(col)
+
+def _round2(values):
+    import numpy as np
+    # np.round(x, 2) agrees with round(x, 2) except when x*100 lands near a .5 tie,
+    # where its inexact scaling can flip the result; redo those few in Python.
+    rounded = np.round(values, 2)
+    frac = np.abs(values * 100 - np.floor(values * 100) - 0.5)
+    for i in np.flatnonzero(frac < 1e-6):
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+def compute_certificate_tiers_batch(columns, issuer_db=None):
+    """Vectorized compute_certificate_tier over columnar features.
+
+    ``columns`` maps feature names to equal-length arrays (a dict of lists/arrays,
+    a structured array or a DataFrame). Missing features take the same defaults as
+    the scalar function. Returns ``{"score": float64 array, "tier": int array}``
+    matching compute_certificate_tier row for row.
+    """
+    import numpy as np
+    n = len(next(iter(columns.values()))) if isinstance(columns, dict) else len(columns)
+    issuer_rep = _column(columns, "issuer_rep", 25, n).astype(np.float64)
+    time_h = _column(columns, "duration_hours", 0, n).astype(np.float64)
+    assessment = _column(columns, "assessment_rigor", 20, n).astype(np.float64)
+    proj_req = _column(columns, "has_project", 0, n).astype(np.int64)
+    proj_comp = _column(columns, "project_complexity", 0, n).astype(np.float64)
+    prereq = _column(columns, "prerequisites_required", 0, n).astype(np.int64)
+    industry = _column(columns, "industry_recognition", 20, n).astype(np.float64)
+    verified = _column(columns, "verified", False, n).astype(bool)
+    time_score = np.clip((time_h/200.0)*100, 0, 100)
+    verify_bonus = np.where(verified, 10.0, 0.0)
+    project_score = np.where(proj_req != 0, proj_comp, 0.0)
+    weights = TIER_WEIGHTS
+    composite = (
+        issuer_rep*weights["issuer_rep"]+
+        assessment*weights["assessment"]+
+        project_score*weights["project"]+
+        time_score*weights["time"]+
+        industry*weights["industry"]+
+        (prereq*100)*weights["prereq"]
+    )
+    composite += verify_bonus
+    score = np.clip(composite, 0, 100)
+    tier = np.full(n, 4, dtype=np.int64)
+    for threshold, t in reversed(TIER_THRESHOLDS):
+        tier[score >= threshold] = t
+    return {"score": _round2(score), "tier": tier}
+
+# ========================
+# Feature store
+# ========================
+class FeatureStore:
+    """SQLite store of extracted text and features per certificate, so tiers can be
+    recomputed after a weight or issuer score change without re-running OCR.
+    One connection is shared by the threads of a process (the async API runs
+    analyze_certificate on executor threads), serialized by a lock."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        # opened lazily so the store can be handed to forked/spawned workers
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS certificates ("
+                "file TEXT PRIMARY KEY, text TEXT, features TEXT, skills TEXT, tags TEXT, "
+                "result TEXT, updated REAL)")
+        return self._conn
+
+    def __getstate__(self):
+        return {"path": self.path, "_conn": None}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def save(self, output: dict, text: str):
+        row = (output["file"], text, json.dumps(output["features"]), json.dumps(output["skills"]),
+               json.dumps(output["tags"]), json.dumps(output["result"]), time.time())
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO certificates VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+
+    def iter_features(self, chunk_size: int = 10000):
+        # keyset pagination, so callers can write back between chunks
+        last = ""
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT file, features FROM certificates WHERE file > ? ORDER BY file LIMIT ?",
+                    (last, chunk_size)).fetchall()
+            if not rows:
+                break
+            last = rows[-1][0]
+            yield [(file, json.loads(features)) for file, features in rows]
+
+    def update_results(self, rows):
+        rows = [(json.dumps(features), json.dumps(result), time.time(), file) for file, features, result in rows]
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE certificates SET features = ?, result = ?, updated = ? WHERE file = ?", rows)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+def retier(store: FeatureStore, issuer_db=None, chunk_size: int = 10000) -> int:
+    # Recompute every stored result from features alone, refreshing issuer reputation
+    # from the current issuer_db. Returns the number of records updated.
+    issuer_db = issuer_db or get_issuer_db()
+    count = 0
+    for chunk in store.iter_features(chunk_size):
+        for _, features in chunk:
+            issuer = features.get("issuer", "unknown")
+            rep = issuer_db.get(issuer, 25) if issuer != "unknown" else 25
+            features["issuer_rep"] = rep
+            features["industry_recognition"] = rep
+        columns = {key: [f.get(key, default) for _, f in chunk] for key, default in [
+            ("issuer_rep", 25), ("duration_hours", 0), ("assessment_rigor", 20), ("has_project", 0),
+            ("project_complexity", 0), ("prerequisites_required", 0), ("industry_recognition", 20),
+            ("verified", False)]}
+        tiers = compute_certificate_tiers_batch(columns, issuer_db)
+        store.update_results(
+            (file, features, {"score": float(score), "tier": int(tier)})
+            for (file, features), score, tier in zip(chunk, tiers["score"], tiers["tier"]))
+        count += len(chunk)
+    return count
+
 # ========================
 # Main analyze function
 # ========================
-def analyze_certificate(file_path: str, issuer_db=None):
-    ext = os.path.splitext(file_path)[1].lower()
-    if ext == ".pdf": text = extract_text_from_pdf(file_path)
-    elif ext in [".png", ".jpg", ".jpeg", ".webp"]: text = extract_text_from_image(file_path)
-    else: return {"error":"Unsupported file format"}
-    
-    verification_link = find_verification_link(text)
-    issuer_name, issuer_rep = fuzzy_lookup_issuer(text, issuer_db or ISSUER_DB)
-    duration = extract_time_commitment(text)
-    project_present = detect_keywords(text, PROJECT_KEYWORDS)
-    project_complexity = 70 if project_present and ('capstone' in text.lower() or 'portfolio' in text.lower()) else (40 if project_present else 0)
-    assessment_present = detect_keywords(text, ASSESSMENT_KEYWORDS)
-    assessment_rigor = 80 if 'proct' in text.lower() or 'invigil' in text.lower() else (60 if assessment_present else 20)
-    prereq_present = detect_keywords(text, PREREQ_KEYWORDS)
-    verified = bool(verification_link)
-    verification_reason = guess_verification_method(text, verification_link)
+def extract_features(text: str, issuer_db=None, timings=NULL_TIMINGS):
+    # Returns (features, skills, tags) for the extracted certificate text.
+    lower_text = text.lower()
+    with timings.stage("issuer_lookup"):
+        issuer_name, issuer_rep = _lookup_issuer_lower(lower_text, issuer_db)
+    with timings.stage("features"):
+        verification_link = find_verification_link(text)
+        duration = extract_time_commitment(text)
+        flags = KEYWORD_SCANNER.scan(lower_text)
+        project_present = "project" in flags
+        project_complexity = 70 if project_present and "capstone" in flags else (40 if project_present else 0)
+        assessment_present = "assessment" in flags
+        assessment_rigor = 80 if "proctored" in flags else (60 if assessment_present else 20)
+        prereq_present = "prerequisite" in flags
+        verified = bool(verification_link)
+        verification_reason = _verification_method(flags, verification_link)
     
     # Extract skills and meaningful tags
-    skills = extract_skills(text)
+    with timings.stage("skills"):
+        skills = get_skill_matcher().find_lower(lower_text)
     tags = []
     if issuer_name:
         tags.append(issuer_name)
@@ -229,30 +1277,291 @@ def analyze_certificate(file_path: str, issuer_db=None):
             "prerequisite": prereq_present
         }
     }
+    return features, skills, tags
+
+def analyze_certificate(file_path: str, issuer_db=None, store=None, timings=False, name=None):
+    # name: what to report and index the file as when file_path is a temp copy
+    name = name or file_path
+    timer = Timings() if timings else NULL_TIMINGS
+    start = time.perf_counter()
+    ext = os.path.splitext(file_path)[1].lower()
+    phash_index, phash, img, duplicate = get_phash_index(), None, None, None
+    if ext == ".pdf": text = extract_text_from_pdf(file_path, timings=timer)
+    elif ext in [".png", ".jpg", ".jpeg", ".webp"]:
+        if phash_index is not None:
+            try:
+                img, phash = preprocess_and_hash(file_path, timer)
+            except Exception as e:
+                print("OCR Image error:", e, file=sys.stderr)
+            if phash is not None:
+                with timer.stage("phash_lookup"):
+                    match = phash_index.query(phash, CONFIG.phash_threshold)
+                if match:
+                    # a re-scan/re-compress of a known image, or another certificate
+                    # on the same template: report it, but still read this one
+                    duplicate = {"file": match[0], "distance": match[1]}
+        text = extract_text_from_image(file_path, timer, preprocessed_img=img)
+    else: return {"error":"Unsupported file format"}
+    timer.count("text_chars", len(text))
     
-    result = compute_certificate_tier(features, issuer_db)
+    features, skills, tags = extract_features(text, issuer_db, timer)
+    fallback = CONFIG.ocr_fallback_profile
+    if features["issuer"] == "unknown" and fallback and fallback != CONFIG.ocr_profile:
+        # the first pass never named an issuer: re-read with the fallback profile and
+        # keep that reading if it does
+        timer.count("issuer_fallbacks")
+        if ext == ".pdf":
+            retry = extract_text_from_pdf(file_path, timings=timer, profile=fallback)
+        else:
+            retry = extract_text_from_image(file_path, timer, preprocessed_img=img, profile=fallback)
+        retried = extract_features(retry, issuer_db, timer)
+        if retried[0]["issuer"] != "unknown":
+            text, (features, skills, tags) = retry, retried
+    with timer.stage("tier"):
+        result = compute_certificate_tier(features, issuer_db)
     
     output = {
-        "file": file_path,
-        "issuer": issuer_name or "unknown",
+        "file": name,
+        "issuer": features["issuer"],
         "features": features,
         "skills": skills,
         "tags": tags,
         "result": result,
         "raw_text_snippet": text[:500]
     }
+    if phash is not None:
+        output["phash"] = _phash_hex(phash)
+        if duplicate:
+            output["near_duplicate_of"] = duplicate
+        # an empty read is usually a swallowed OCR failure; don't make it the
+        # reference later copies are matched against
+        if text.strip():
+            with timer.stage("phash_store"):
+                phash_index.add(phash, name)
+    if store is not None:
+        with timer.stage("store"):
+            store.save(output, text)
+    if timings:
+        timer.stages["total"] = time.perf_counter() - start
+        output["timings"] = timer.as_dict()
     return output
 
+# ========================
+# Async API
+# ========================
+_SEMAPHORES = {}
+
+def _loop_semaphore() -> asyncio.Semaphore:
+    # one default semaphore per event loop; asyncio primitives can't be shared across loops
+    loop = asyncio.get_running_loop()
+    sem = _SEMAPHORES.get(loop)
+    if sem is None:
+        for stale in [l for l in _SEMAPHORES if l.is_closed()]:
+            del _SEMAPHORES[stale]
+        sem = _SEMAPHORES[loop] = asyncio.Semaphore(CONFIG.async_concurrency)
+    return sem
+
+async def analyze_certificate_async(file_path: str, issuer_db=None, store=None, timings=False,
+                                    semaphore=None, executor=None):
+    """analyze_certificate off the event loop. PDF rendering and OCR run on
+    ``executor`` (the loop's default thread pool if None), with at most
+    ``CONFIG.async_concurrency`` certificates in flight unless a ``semaphore``
+    is passed."""
+    async with semaphore or _loop_semaphore():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(analyze_certificate, file_path, issuer_db, store, timings))
+
+async def analyze_many_async(files, issuer_db=None, concurrency=None, timings=False, executor=None):
+    # Async generator of (file, result) in completion order. Only twice the
+    # concurrency is scheduled at a time, so large file lists stay cheap.
+    concurrency = concurrency or CONFIG.async_concurrency
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(file_path):
+        return file_path, await analyze_certificate_async(
+            file_path, issuer_db, timings=timings, semaphore=semaphore, executor=executor)
+
+    files = iter(files)
+    pending = set()
+    try:
+        while True:
+            for f in files:
+                pending.add(asyncio.ensure_future(run(f)))
+                if len(pending) >= 2 * concurrency:
+                    break
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+_LAZY_ATTRS = {"SKILL_TAGS": get_skill_tags, "SKILL_MATCHER": get_skill_matcher,
+               "ISSUER_INDEX": get_issuer_index, "OCR_CACHE": get_ocr_cache,
+               "ISSUER_DB": get_issuer_db, "ISSUER_ALIASES": lambda: get_issuer_registry().aliases}
+
+def __getattr__(name):
+    # keep `testing.SKILL_TAGS` & co. working for callers while loading them on demand
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ========================
+# Batch processing
+# ========================
+SUPPORTED_EXTS = [".pdf", ".png", ".jpg", ".jpeg", ".webp"]
+
+def collect_files(directory=None, pattern=None):
+    files = []
+    if directory:
+        for root, _, names in os.walk(directory):
+            for name in names:
+                if os.path.splitext(name)[1].lower() in SUPPORTED_EXTS:
+                    files.append(os.path.join(root, name))
+    if pattern:
+        files.extend(p for p in glob.glob(pattern, recursive=True)
+                     if os.path.splitext(p)[1].lower() in SUPPORTED_EXTS)
+    return sorted(set(files))
+
+_WORKER_STORE = None
+
+def _init_worker(store_path=None, config=None):
+    global _WORKER_STORE
+    # One certificate per core already: extra page threads and tesseract's own
+    # OpenMP threads would only oversubscribe it. Explicit settings still win.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    config = config or CONFIG
+    configure(config, ocr_page_workers=config.ocr_page_workers or 1)
+    # Build the tables here so each worker pays the load cost once, not once per
+    # certificate (and not in the parent before forking).
+    get_skill_matcher(), get_issuer_index()
+    _WORKER_STORE = FeatureStore(store_path) if store_path else None
+
+def _analyze_safe(file_path: str, timings=False):
+    try:
+        return analyze_certificate(file_path, store=_WORKER_STORE, timings=timings)
+    except Exception as e:
+        return {"file": file_path, "error": str(e)}
+
+def iter_analyze_batch(files, workers=None, store_path=None, timings=False):
+    # Yields (file, result) in completion order, keeping only a few tasks per worker
+    # in flight so memory stays flat however many files there are.
+    workers = workers or os.cpu_count() or 1
+    files = iter(files)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(store_path, CONFIG)) as pool:
+        pending = {}
+        while True:
+            for f in files:
+                pending[pool.submit(_analyze_safe, f, timings)] = f
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield pending.pop(fut), fut.result()
+
+def analyze_batch(files, workers=None, store_path=None, timings=False):
+    return dict(iter_analyze_batch(files, workers, store_path, timings))
+
+def with_histogram(results, histogram: TimingHistogram):
+    # pass (file, result) pairs through, feeding each result's timings to the histogram
+    for file_path, res in results:
+        if "timings" in res:
+            histogram.add(res["timings"])
+        yield file_path, res
+
+def write_jsonl(results, fp):
+    # one {"<file>": result} object per line, flushed as each result lands
+    count = 0
+    for file_path, res in results:
+        fp.write(json.dumps({file_path: res}) + "\n")
+        fp.flush()
+        count += 1
+    return count
+
 # ========================
 # CLI
 # ========================
 if __name__=="__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--file", required=True, help="Certificate file path (PDF/Image)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="Certificate file path (PDF/Image)")
+    source.add_argument("--dir", help="Analyze every supported certificate under this directory")
+    source.add_argument("--glob", help="Analyze every certificate matching this glob pattern")
+    source.add_argument("--retier", action="store_true", help="Recompute tiers for every record in --store without OCR")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for batch mode (default: CPU count)")
     parser.add_argument("--save-json", required=False, help="Save output JSON to file")
+    parser.add_argument("--jsonl", required=False, help="Stream batch results as JSON Lines to this file ('-' for stdout)")
+    parser.add_argument("--store", required=False, help="SQLite feature store to record extracted text/features in")
+    parser.add_argument("--ocr-workers", type=int, default=None, help="Concurrent OCR threads per PDF (default: min(4, cpus); 1 per batch worker)")
+    parser.add_argument("--pdf-ocr-mode", choices=["page", "regions"], default=None,
+                        help="'regions' also OCRs embedded images on pages that have a text layer")
+    parser.add_argument("--ocr-mode", choices=["full", "roi"], default=None,
+                        help="'roi' OCRs layout blocks one at a time and stops once issuer, skills and a URL are found")
+    parser.add_argument("--ocr-backend", choices=["pytesseract", "pipe", "tesserocr"], default=None,
+                        help="OCR engine; 'pipe' avoids temp files, 'tesserocr' keeps a pool of Tesseract API handles per process")
+    parser.add_argument("--ocr-profile", default=None,
+                        help=f"OCR profile ({', '.join(OCR_PROFILES)}) or a raw tesseract config such as '--oem 1 --psm 4'")
+    parser.add_argument("--ocr-fallback", default=None,
+                        help="Profile to re-read low-confidence pages and issuer-less documents with (e.g. 'accurate')")
+    parser.add_argument("--quality-retry", action="store_true",
+                        help="Re-OCR pages below OCR_MIN_CONFIDENCE with binarized/deskewed/upscaled variants")
+    parser.add_argument("--phash-index", required=False, help="SQLite perceptual-hash index; flags near-duplicate image certificates")
+    parser.add_argument("--timings", action="store_true", help="Record per-stage timings; batch runs also print a summary to stderr")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk OCR cache")
     args = parser.parse_args()
+    if args.no_cache:
+        configure(cache_enabled=False)
+    if args.ocr_workers:
+        configure(ocr_page_workers=args.ocr_workers)
+    if args.pdf_ocr_mode:
+        configure(pdf_ocr_mode=args.pdf_ocr_mode)
+    if args.ocr_mode:
+        configure(ocr_mode=args.ocr_mode)
+    if args.ocr_backend:
+        configure(ocr_backend=args.ocr_backend)
+    if args.ocr_profile:
+        configure(ocr_profile=args.ocr_profile)
+    if args.ocr_fallback:
+        configure(ocr_fallback_profile=args.ocr_fallback)
+    if args.quality_retry:
+        configure(ocr_quality_retry=True)
+    if args.phash_index:
+        configure(phash_index_path=args.phash_index)
     
-    res = analyze_certificate(args.file)
+    if args.retier:
+        if not args.store:
+            parser.error("--retier requires --store")
+        store = FeatureStore(args.store)
+        print(f"[+] Re-tiered {retier(store)} certificates in {args.store}")
+        store.close()
+        sys.exit(0)
+    if args.file:
+        store = FeatureStore(args.store) if args.store else None
+        res = analyze_certificate(args.file, store=store, timings=args.timings)
+    else:
+        files = collect_files(args.dir, args.glob)
+        print(f"[+] Analyzing {len(files)} certificates", file=sys.stderr)
+        histogram = TimingHistogram()
+        results = with_histogram(iter_analyze_batch(files, args.workers, args.store, args.timings), histogram)
+        if args.jsonl:
+            if args.jsonl == "-":
+                write_jsonl(results, sys.stdout)
+            else:
+                with open(args.jsonl, "w", encoding="utf-8") as f:
+                    count = write_jsonl(results, f)
+                print(f"[+] Streamed {count} results to {args.jsonl}", file=sys.stderr)
+            res = None
+        else:
+            res = dict(results)
+        if args.timings:
+            print(json.dumps({"timings": histogram.summary()}, indent=4), file=sys.stderr)
+    if res is None:
+        sys.exit(0)
     if args.save_json:
         with open(args.save_json, "w", encoding="utf-8") as f:
             json.dump(res, f, indent=4)
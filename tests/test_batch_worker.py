@@ -0,0 +1,21 @@
+import pytest
+
+import testing
+
+@pytest.fixture
+def restore_config(monkeypatch):
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    saved = testing.CONFIG
+    yield
+    testing.configure(saved)
+
+def test_worker_defaults_to_one_page_thread(restore_config):
+    testing._init_worker(config=testing.Config())
+    assert testing.CONFIG.page_workers == 1
+    assert testing.os.environ["OMP_THREAD_LIMIT"] == "1"
+
+def test_worker_keeps_explicit_settings(restore_config, monkeypatch):
+    monkeypatch.setenv("OMP_THREAD_LIMIT", "2")
+    testing._init_worker(config=testing.Config.from_env({"OCR_PAGE_WORKERS": "3"}))
+    assert testing.CONFIG.page_workers == 3
+    assert testing.os.environ["OMP_THREAD_LIMIT"] == "2"
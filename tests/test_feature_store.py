@@ -0,0 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from testing import FeatureStore
+
+def output(name):
+    return {"file": name, "features": {"issuer": "ibm"}, "skills": [], "tags": [], "result": {"score": 1.0, "tier": 4}}
+
+def test_save_from_several_threads(tmp_path):
+    store = FeatureStore(str(tmp_path / "features.db"))
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda i: store.save(output(f"cert{i}.png"), "text"), range(40)))
+    assert sum(len(chunk) for chunk in store.iter_features(7)) == 40
+    store.close()
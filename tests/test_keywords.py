@@ -0,0 +1,22 @@
+import random
+
+from testing import KEYWORD_FLAGS, KeywordScanner
+
+def per_keyword(lower_text):
+    # the original `any(k in text for k in group)` check per flag
+    return {flag for flag, keywords in KEYWORD_FLAGS.items() if any(k in lower_text for k in keywords)}
+
+def test_matches_substring_checks():
+    scanner = KeywordScanner(KEYWORD_FLAGS)
+    pieces = sorted({k for ks in KEYWORD_FLAGS.values() for k in ks})
+    # fragments glue into overlapping/nested keywords ("final exam", "proctored", "prereq")
+    pieces += ["final", "ed", "or", "uisite", "ating", " ", "-", "x", "ex", "am", "pro", "ct"]
+    rng = random.Random(0)
+    for _ in range(20000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 8)))
+        assert scanner.scan(text) == per_keyword(text), text
+
+def test_shorter_keywords_inside_longer_ones_count():
+    scanner = KeywordScanner(KEYWORD_FLAGS)
+    assert scanner.scan("a proctored final exam") == {"assessment", "proctored"}
+    assert scanner.scan("capstone portfolio") == {"project", "capstone"}
@@ -0,0 +1,20 @@
+import pytest
+
+from ocr_backends import OCRResult, TesserocrPoolBackend
+
+def test_tesserocr_pool_with_oem():
+    pytest.importorskip("tesserocr")
+    from PIL import Image
+    backend = TesserocrPoolBackend(1, oem=1)
+    try:
+        assert backend.image_to_string(Image.new("L", (200, 60), 255), "--psm 6").strip() == ""
+    finally:
+        backend.close()
+
+def test_result_from_data_keeps_line_structure():
+    data = {"text": ["", "Certificate", "of", "completion", "IBM"], "conf": [-1, 90, 80, 70, 95],
+            "left": [0] * 5, "top": [0] * 5, "width": [1] * 5, "height": [1] * 5, "page_num": [1] * 5,
+            "block_num": [1, 1, 1, 1, 2], "par_num": [1] * 5, "line_num": [1, 1, 1, 2, 1]}
+    result = OCRResult.from_data(data)
+    assert result.text == "Certificate of\ncompletion\n\nIBM"
+    assert result.confidence == pytest.approx(83.75)
@@ -0,0 +1,13 @@
+import testing
+
+def test_unwritable_cache_keeps_extracted_text(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    source = tmp_path / "cert.png"
+    source.write_bytes(b"image bytes")
+    testing.configure(cache_enabled=True, cache_dir=str(blocker / "cache"))
+    try:
+        text = testing.cached_extract(str(source), "image", lambda p, errors: "EXTRACTED TEXT")
+    finally:
+        testing.configure(config=testing.Config.from_env())
+    assert text == "EXTRACTED TEXT"
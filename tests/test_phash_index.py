@@ -0,0 +1,29 @@
+import sqlite3
+
+import pytest
+
+import testing
+
+def test_query_returns_closest_file(tmp_path):
+    index = testing.PHashIndex(str(tmp_path / "phash.db"))
+    index.add(0b0111, "a.png")
+    index.add(0b0011, "b.png")
+    assert index.query(0b0001, 2) == ("b.png", 1)
+    assert index.query(1 << 200, 2) is None
+
+def test_add_to_index_with_legacy_result_column(tmp_path):
+    path = str(tmp_path / "phash.db")
+    bands = ", ".join(f"b{i} INTEGER" for i in range(testing.PHASH_BANDS))
+    with sqlite3.connect(path) as conn:
+        conn.execute(f"CREATE TABLE phashes (hash TEXT, {bands}, file TEXT, result TEXT)")
+    index = testing.PHashIndex(path)
+    index.add(5, "cert.png")
+    assert index.query(5, 0) == ("cert.png", 0)
+
+@pytest.mark.parametrize("threshold", [-1, testing.PHASH_BANDS])
+def test_threshold_out_of_range_rejected_up_front(threshold):
+    with pytest.raises(ValueError):
+        testing.Config.from_env({"PHASH_THRESHOLD": str(threshold)})
+    with pytest.raises(ValueError):
+        testing.configure(phash_threshold=threshold)
+    assert testing.CONFIG.phash_threshold != threshold
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+import testing
+from ocr_backends import OCRResult
+
+def reading(text, count, conf):
+    return OCRResult(text, [("w", conf, (0, 0, 1, 1))] * count)
+
+def run_retry(monkeypatch, original, retries):
+    from PIL import Image
+    retries = iter(retries)
+    monkeypatch.setattr(testing, "_recognize", lambda img, config, timings=None: next(retries))
+    return testing._quality_retry(Image.new("L", (120, 80), 255), original)
+
+def test_variant_that_drops_words_does_not_win(monkeypatch):
+    original = reading("full page", 40, 55.0)
+    result = run_retry(monkeypatch, original, [reading("three words", 3, 95.0)] * 3)
+    assert result is original
+
+def test_more_confident_full_reading_wins_and_stops(monkeypatch):
+    original = reading("full page", 40, 55.0)
+    better = reading("binarized", 38, 75.0)
+    result = run_retry(monkeypatch, original, [better])  # a second call would raise StopIteration
+    assert result is better
+
+def test_keeps_most_confident_eligible_variant(monkeypatch):
+    original = reading("full page", 40, 30.0)
+    retries = [reading("binarized", 40, 40.0), reading("deskewed", 10, 90.0), reading("upscaled", 45, 50.0)]
+    assert run_retry(monkeypatch, original, retries).text == "upscaled"
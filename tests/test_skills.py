@@ -0,0 +1,35 @@
+import re
+import random
+
+from testing import SkillMatcher, get_skill_tags
+
+FILLER = ["the", "and", "with", "native", "js", "learning", "data", "cloud", "-", ",", "/", ".", "(", ")", "+", "#"]
+SEPARATORS = [" ", " ", "\n", "", "-", ", ", "/", "."]
+
+def per_skill(skills, text):
+    # the original one-regex-per-skill search
+    lower = text.lower()
+    return {s for s in skills if re.search(r"\b" + re.escape(s.lower()) + r"\b", lower)}
+
+def random_text(rng, skills):
+    words = [rng.choice(skills) if rng.random() < 0.5 else rng.choice(FILLER) for _ in range(rng.randint(0, 12))]
+    text = ""
+    for word in words:
+        word = word.upper() if rng.random() < 0.2 else word
+        text += word + rng.choice(SEPARATORS)
+    return text
+
+def test_matches_per_skill_search():
+    skills = get_skill_tags()
+    matcher = SkillMatcher(skills)
+    rng = random.Random(0)
+    for _ in range(3000):
+        text = random_text(rng, skills)
+        assert sorted(matcher.find(text)) == sorted(per_skill(skills, text)), text
+
+def test_prefix_skills_are_rechecked():
+    matcher = SkillMatcher(["React", "React Native", "C", "C++", "Data Mining"])
+    assert sorted(matcher.find("Built with React Native and C")) == ["C", "React", "React Native"]
+    assert matcher.find("Reactive") == []
+    # `\bc\+\+\b` needs a word character after "++", as in the per-skill search
+    assert sorted(matcher.find("C++ basics")) == ["C"]
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from testing import compute_certificate_tier, compute_certificate_tiers_batch
+
+KEYS = ["issuer_rep", "duration_hours", "assessment_rigor", "has_project", "project_complexity",
+        "prerequisites_required", "industry_recognition", "verified"]
+
+def random_features(rng):
+    # mostly the coarse values the pipeline produces, which land on .xx5 ties often
+    rep = rng.choice([15, 20, 25, 30, 40, 50, 70, 75, 80, 85, 90, 95, rng.uniform(0, 100)])
+    return {
+        "issuer_rep": rep,
+        "duration_hours": rng.choice([0, 1.5, 6, 12, 20, 40, 80, 400, round(rng.uniform(0, 300), 1)]),
+        "assessment_rigor": rng.choice([20, 60, 80]),
+        "has_project": rng.randint(0, 1),
+        "project_complexity": rng.choice([0, 40, 70]),
+        "prerequisites_required": rng.randint(0, 1),
+        "industry_recognition": rep,
+        "verified": rng.random() < 0.5,
+    }
+
+def check(rows, columns):
+    batch = compute_certificate_tiers_batch(columns)
+    for i, features in enumerate(rows):
+        expected = compute_certificate_tier(features)
+        assert batch["score"][i] == expected["score"], features
+        assert batch["tier"][i] == expected["tier"], features
+
+def test_batch_matches_scalar():
+    rng = random.Random(0)
+    rows = [random_features(rng) for _ in range(50000)]
+    check(rows, {key: [f[key] for f in rows] for key in KEYS})
+
+def test_rounding_ties():
+    # composites whose third decimal is exactly 5 in decimal but not in binary;
+    # plain floats, as features arrive from the pipeline/JSON (round() on numpy
+    # scalars would use numpy's rounding in the scalar function too)
+    rows = [{"issuer_rep": rep / 100, "industry_recognition": rep / 100, "duration_hours": h}
+            for rep in range(10001) for h in (0, 0.3, 1.7)]
+    check(rows, {key: [f[key] for f in rows] for key in ("issuer_rep", "industry_recognition", "duration_hours")})
+
+def test_missing_columns_take_scalar_defaults():
+    rows = [{"issuer_rep": 90}, {"issuer_rep": 10}]
+    check(rows, {"issuer_rep": [90, 10]})
+
+def test_column_input_types():
+    rng = random.Random(1)
+    rows = [random_features(rng) for _ in range(200)]
+    columns = {key: [f[key] for f in rows] for key in KEYS}
+    check(rows, {key: np.asarray(values) for key, values in columns.items()})
+    structured = np.array([tuple(f[key] for key in KEYS) for f in rows],
+                          dtype=[(key, bool if key == "verified" else np.float64) for key in KEYS])
+    check(rows, structured)
+    # missing fields take the scalar defaults
+    partial = ["issuer_rep", "duration_hours"]
+    check([{key: f[key] for key in partial} for f in rows], structured[partial])
+
+def test_dataframe_input():
+    pd = pytest.importorskip("pandas")
+    rng = random.Random(2)
+    rows = [random_features(rng) for _ in range(200)]
+    check(rows, pd.DataFrame(rows))